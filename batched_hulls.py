@@ -0,0 +1,172 @@
+import numpy as np
+from hull_engines import _CHAIN_SHRINK, _monotone_chain
+from predicates import orientation, orientation_bound
+
+
+class BatchedConvexHulls:
+    def __init__(self, points, labels):
+        """
+        Compute the convex hull of every label group of a point set in one
+        call, without building one ConvexHull_QuickHull object per group.
+
+        All groups are handled together: one lexsort by (label, x, y), then
+        a monotone chain whose passes run over every group at once, so there
+        is no Python loop over groups.
+
+        Results are in segment-offset form: the hull of the i-th group is
+        vertices[offsets[i]:offsets[i + 1]], ordered like ConvexHull_QuickHull
+        (clockwise, starting at the leftmost point; a group on one vertical
+        line is its lowest point only), and its area is area[i].
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+        labels (numpy.ndarray): Integer group label of every point, shape (n,)
+        """
+        self.points = np.asarray(points)
+        self.labels = np.asarray(labels)
+        if len(self.labels) != len(self.points):
+            raise ValueError("points and labels must have the same length")
+
+        self._compute_hulls()
+        self._compute_additional_properties()
+
+    def _compute_hulls(self):
+        """
+        Fill group_labels, offsets and vertices.
+        """
+        points = np.asarray(self.points, dtype=float)
+        order = np.lexsort((points[:, 1], points[:, 0], self.labels))
+        x = points[order, 0]
+        y = points[order, 1]
+        labels = self.labels[order]
+
+        # A repeated point can only be on the hull once: keep the first copy
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = labels[1:] != labels[:-1]
+        repeated = np.zeros(len(order), dtype=bool)
+        repeated[1:] = ~new_group[1:] & (x[1:] == x[:-1]) & (y[1:] == y[:-1])
+        chain = np.flatnonzero(~repeated)
+
+        group = np.cumsum(new_group[chain]) - 1
+        starts = np.flatnonzero(new_group[chain])
+        self.group_labels = labels[chain[starts]]
+        # Groups whose first and last point (in x, y order) share x
+        ends = np.append(starts[1:], len(chain)) - 1 if len(chain) else starts
+        vertical = x[chain[starts]] == x[chain[ends]]
+
+        # One bound over every group is coarser but still valid
+        bound = orientation_bound(points)
+        upper, upper_group = _segment_monotone_chain(x, y, chain, group, upper=True, bound=bound)
+        lower, lower_group = _segment_monotone_chain(x, y, chain, group, upper=False, bound=bound)
+
+        # Both chains run from the first to the last point of each group;
+        # the lower chain is walked back without repeating those endpoints.
+        lower_inner = np.zeros(len(lower), dtype=bool)
+        lower_inner[1:-1] = (lower_group[1:-1] == lower_group[:-2]) & (lower_group[1:-1] == lower_group[2:])
+
+        positions = np.concatenate((upper, lower[lower_inner]))
+        groups = np.concatenate((upper_group, lower_group[lower_inner]))
+        part = np.concatenate((np.zeros(len(upper), dtype=np.int8), np.ones(lower_inner.sum(), dtype=np.int8)))
+        walk = np.concatenate((upper, -lower[lower_inner]))
+        hull_order = np.lexsort((walk, part, groups))
+        positions = positions[hull_order]
+        groups = groups[hull_order]
+
+        # A vertical group keeps only its lowest point, as ConvexHull_QuickHull
+        lowest = ~vertical[groups] | (positions == chain[starts][groups])
+        positions = positions[lowest]
+        groups = groups[lowest]
+
+        counts = np.bincount(groups, minlength=len(self.group_labels))
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.vertices = order[positions]
+
+    def _compute_additional_properties(self):
+        """
+        Simplices and per-group areas, segment-wise.
+        """
+        # Index of the next vertex around each group's hull
+        following = np.arange(1, len(self.vertices) + 1)
+        following[self.offsets[1:] - 1] = self.offsets[:-1]
+
+        self.simplices = np.column_stack([self.vertices, self.vertices[following]])
+
+        # Shoelace formula, summed per group
+        x = self.points[self.vertices, 0]
+        y = self.points[self.vertices, 1]
+        cross = x * y[following] - x[following] * y
+        if len(cross):
+            self.area = 0.5 * np.abs(np.add.reduceat(cross, self.offsets[:-1]))
+        else:
+            self.area = np.zeros(0)
+
+    def hull_vertices(self, i):
+        """Vertex indices of the i-th group's hull."""
+        return self.vertices[self.offsets[i]:self.offsets[i + 1]]
+
+    def __len__(self):
+        """Return number of groups"""
+        return len(self.group_labels)
+
+
+def _segment_monotone_chain(x, y, chain, group, upper=True, bound=None):
+    """
+    Monotone chain over many groups at once. chain holds sorted positions
+    (grouped, each group sorted by x then y, no repeated points); an
+    interior point is dropped while it does not turn strictly the hull's way
+    (clockwise for the upper chain). Each pass handles every group.
+
+    Passes repeat only while they shrink the groups still changing by
+    1 / _CHAIN_SHRINK, as in _monotone_chain; the groups they leave
+    unfinished then get _monotone_chain's stack pass, one slice each, so a
+    group costs linear time after the sort however its points are laid
+    out.
+
+    Returns (positions, group ids) of the surviving chain points
+    """
+    sign = 1 if upper else -1
+    while len(chain) > 2:
+        drop = _segment_drops(x, y, chain, group, sign, bound)
+        if not drop.any():
+            return chain, group
+        # Points of the groups this pass changed
+        sizes = np.bincount(group)
+        changing = sizes[np.bincount(group[1:-1][drop], minlength=len(sizes)) > 0].sum()
+        keep = np.ones(len(chain), dtype=bool)
+        keep[1:-1] = ~drop
+        chain = chain[keep]
+        group = group[keep]
+        if drop.sum() * _CHAIN_SHRINK < changing:
+            break
+    if len(chain) <= 2:
+        return chain, group
+
+    drop = _segment_drops(x, y, chain, group, sign, bound)
+    if not drop.any():
+        return chain, group
+    starts = np.flatnonzero(np.concatenate(([True], group[1:] != group[:-1])))
+    ends = np.append(starts[1:], len(chain))
+    unfinished = np.isin(group[starts], group[1:-1][drop])
+
+    keep = np.ones(len(chain), dtype=bool)
+    settled_chain, settled_group = [], []
+    for start, end in zip(starts[unfinished], ends[unfinished]):
+        keep[start:end] = False
+        settled = _monotone_chain(x, y, chain[start:end], upper=upper, bound=bound)
+        settled_chain.append(settled)
+        settled_group.append(np.full(len(settled), group[start]))
+    chain = np.concatenate([chain[keep]] + settled_chain)
+    group = np.concatenate([group[keep]] + settled_group)
+    # Positions are grouped already, so sorting them restores the order
+    order = np.argsort(chain, kind="stable")
+    return chain[order], group[order]
+
+
+def _segment_drops(x, y, chain, group, sign, bound):
+    """Interior chain points (chain[1:-1]) that do not turn the hull's way."""
+    cx = x[chain]
+    cy = y[chain]
+    turn = sign * orientation(cx[:-2], cy[:-2], cx[1:-1], cy[1:-1], cx[2:], cy[2:], bound=bound)
+    # The first and last point of a group always stay
+    interior = (group[1:-1] == group[:-2]) & (group[1:-1] == group[2:])
+    return interior & (turn >= 0)
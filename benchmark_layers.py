@@ -0,0 +1,75 @@
+import time
+import numpy as np
+from convex_layers import compute_convex_layers
+from point_generators import generate_points
+from config import *
+
+# Layer paths compared by the sweep: (label, engine, hull_engine)
+LAYER_PATHS = [
+    ("quickhull/reference", "quickhull", "reference"),
+    ("quickhull/indexed", "quickhull", "indexed"),
+    ("quickhull/auto", "quickhull", "auto"),
+    ("presorted", "presorted", None),
+    ("hull_tree", "hull_tree", None),
+]
+
+
+def time_layers(points, engine, hull_engine):
+    """
+    Time one full onion peeling.
+
+    Returns (seconds, number of layers)
+    """
+    kwargs = {"engine": engine}
+    if hull_engine is not None:
+        kwargs["hull_engine"] = hull_engine
+    start_time = time.perf_counter()
+    layers = compute_convex_layers(points, **kwargs)
+    return time.perf_counter() - start_time, len(layers)
+
+
+def find_crossover(sizes, baseline_times, candidate_times):
+    """
+    Smallest size from which the candidate stays faster than the baseline,
+    or None if it never overtakes it within the sweep.
+    """
+    crossover = None
+    for size, baseline, candidate in zip(sizes, baseline_times, candidate_times):
+        if baseline is None or candidate is None:
+            continue
+        if candidate < baseline:
+            if crossover is None:
+                crossover = size
+        else:
+            crossover = None
+    return crossover
+
+
+if __name__ == "__main__":
+    for gen_mode in ("random", "grid"):
+        rng = np.random.default_rng(RANDOM_SEED)
+        times = {label: [] for label, _, _ in LAYER_PATHS}
+
+        print("\n_______________________________________________")
+        print(f"MODE: {gen_mode}")
+        print(f"{'points':>8} {'layers':>7} " + " ".join(f"{label:>20}" for label, _, _ in LAYER_PATHS))
+
+        for size in LAYERS_BENCHMARK_SIZES:
+            points = generate_points(gen_mode, size, X_LIM, Y_LIM, POINTS_RANGE, rng=rng)
+            row = []
+            for label, engine, hull_engine in LAYER_PATHS:
+                if hull_engine == "reference" and size > LAYERS_BENCHMARK_REFERENCE_MAX:
+                    times[label].append(None)
+                    row.append(f"{'-':>20}")
+                    continue
+                seconds, layer_count = time_layers(points, engine, hull_engine)
+                times[label].append(seconds)
+                row.append(f"{seconds:>19.4f}s")
+            print(f"{len(points):>8} {layer_count:>7} " + " ".join(row), flush=True)
+
+        for baseline in ("quickhull/reference", "quickhull/indexed"):
+            crossover = find_crossover(LAYERS_BENCHMARK_SIZES, times[baseline], times["hull_tree"])
+            if crossover is None:
+                print(f"hull_tree does not overtake {baseline} within the sweep")
+            else:
+                print(f"hull_tree overtakes {baseline} from {crossover} points")
@@ -0,0 +1,232 @@
+import json
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from convex_layers import compute_convex_layers
+from point_generators import generate_points
+from config import *
+
+# Hand-recorded results of the original main_tests.py sweep (QuickHull per
+# layer, reference engine), keyed by the generator mode they were run with
+BASELINE_FILES = {
+    "grid": "grid_stats_10k",
+    "random": "random_stats_10k",
+}
+
+_STATS_FIELDS = {
+    "points": re.compile(r"Points volume:\s*(\d+)"),
+    "peak_kb": re.compile(r"Peak Memory Usage:\s*([\d.]+)\s*KB"),
+    "seconds": re.compile(r"Time taken to compute convex layers:\s*([\d.]+)\s*seconds"),
+    "layers": re.compile(r"Layers computed:\s*(\d+)"),
+}
+
+
+def parse_stats_file(path):
+    """
+    Parse a grid_stats_10k / random_stats_10k style log.
+
+    Each run is a block separated by a line of underscores, holding the
+    lines main_tests.py prints. Blocks missing a field are skipped.
+
+    Returns dict {requested points: {"points", "peak_kb", "seconds", "layers"}}
+    """
+    with open(path) as f:
+        text = f.read()
+
+    runs = {}
+    for block in re.split(r"^_+\s*$", text, flags=re.MULTILINE):
+        run = {}
+        for field, pattern in _STATS_FIELDS.items():
+            match = pattern.search(block)
+            if match is None:
+                break
+            run[field] = float(match.group(1)) if field in ("peak_kb", "seconds") else int(match.group(1))
+        else:
+            runs[run["points"]] = run
+    return runs
+
+
+def load_baselines(baseline_files=BASELINE_FILES, baseline_json=None):
+    """
+    Historical timings per mode and size.
+
+    The text logs are read first; a JSON report written by an earlier run
+    of this script, if given, overrides them for the sizes it covers.
+
+    Returns dict {mode: {requested points: seconds}}
+    """
+    baselines = {}
+    for mode, path in baseline_files.items():
+        try:
+            runs = parse_stats_file(path)
+        except FileNotFoundError:
+            continue
+        baselines[mode] = {size: run["seconds"] for size, run in runs.items()}
+
+    if baseline_json is not None:
+        with open(baseline_json) as f:
+            report = json.load(f)
+        for mode, entry in report["modes"].items():
+            for run in entry["runs"]:
+                baselines.setdefault(mode, {})[run["requested_points"]] = run["median_seconds"]
+    return baselines
+
+
+def time_run(points, engine, repeats, warmup, **options):
+    """
+    Time compute_convex_layers with perf_counter, tracemalloc off.
+
+    options (hull_engine, prefilter, dedup) are passed on to
+    compute_convex_layers.
+
+    Returns (list of seconds per repeat, number of layers)
+    """
+    for _ in range(warmup):
+        compute_convex_layers(points, engine=engine, **options)
+
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        layers = compute_convex_layers(points, engine=engine, **options)
+        timings.append(time.perf_counter() - start_time)
+    return timings, len(layers)
+
+
+def measure_peak_memory(points, engine, **options):
+    """
+    Peak traced allocation of one run, in KB. Kept apart from the timed
+    runs because tracemalloc slows every allocation down.
+    """
+    tracemalloc.start()
+    try:
+        compute_convex_layers(points, engine=engine, **options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def fit_exponent(sizes, seconds):
+    """
+    Empirical complexity exponent k of seconds ~ c * n^k, by a least-squares
+    fit in log-log space. Sizes below 2 points or runs too fast to time
+    are left out.
+
+    Returns k, or None with fewer than two usable sizes
+    """
+    usable = [(n, t) for n, t in zip(sizes, seconds) if n >= 2 and t > 0]
+    if len(usable) < 2:
+        return None
+    log_n = np.log([n for n, _ in usable])
+    log_t = np.log([t for _, t in usable])
+    slope, _ = np.polyfit(log_n, log_t, 1)
+    return float(slope)
+
+
+def run_benchmark(modes, sizes, engine, repeats, warmup, seed=RANDOM_SEED,
+                  hull_engine="indexed", prefilter=False, dedup=False):
+    """
+    Sweep every mode over every size, peeling with the given
+    compute_convex_layers settings.
+
+    Returns the JSON-ready report dict
+    """
+    options = {"hull_engine": hull_engine, "prefilter": prefilter, "dedup": dedup}
+    report = {
+        "engine": engine,
+        **options,
+        "repeats": repeats,
+        "warmup": warmup,
+        "seed": seed,
+        "modes": {},
+    }
+    for gen_mode in modes:
+        rng = np.random.default_rng(seed)
+        runs = []
+        for size in sizes:
+            points = generate_points(gen_mode, size, X_LIM, Y_LIM, POINTS_RANGE, rng=rng)
+            timings, layer_count = time_run(points, engine, repeats, warmup, **options)
+            runs.append({
+                "requested_points": size,
+                "points": len(points),
+                "layers": layer_count,
+                "seconds": timings,
+                "min_seconds": min(timings),
+                "median_seconds": statistics.median(timings),
+                "peak_kb": measure_peak_memory(points, engine, **options),
+            })
+        report["modes"][gen_mode] = {
+            "runs": runs,
+            "exponent": fit_exponent([run["points"] for run in runs],
+                                     [run["median_seconds"] for run in runs]),
+        }
+    return report
+
+
+def check_regressions(report, baselines, threshold):
+    """
+    Compare median timings against the baselines at matching sizes.
+
+    A run regresses when it is more than threshold times slower than its
+    baseline. Runs whose baseline took under SCALING_MIN_BASELINE_SECONDS
+    are only reported, since timer noise dominates them.
+
+    Returns list of (mode, requested points, seconds, baseline seconds, ratio, regressed)
+    """
+    rows = []
+    for gen_mode, entry in report["modes"].items():
+        mode_baselines = baselines.get(gen_mode, {})
+        for run in entry["runs"]:
+            baseline = mode_baselines.get(run["requested_points"])
+            if baseline is None:
+                continue
+            seconds = run["median_seconds"]
+            ratio = seconds / baseline if baseline > 0 else float("inf")
+            regressed = baseline >= SCALING_MIN_BASELINE_SECONDS and ratio > threshold
+            rows.append((gen_mode, run["requested_points"], seconds, baseline, ratio, regressed))
+    return rows
+
+
+if __name__ == "__main__":
+    baselines = load_baselines(baseline_json=SCALING_BASELINE_JSON)
+    # The same peeling setup the entry scripts run
+    report = run_benchmark(SCALING_BENCHMARK_MODES, SCALING_BENCHMARK_SIZES, LAYERS_ENGINE,
+                           SCALING_BENCHMARK_REPEATS, SCALING_BENCHMARK_WARMUP,
+                           hull_engine=LAYERS_HULL_ENGINE, prefilter=LAYERS_PREFILTER, dedup=LAYERS_DEDUP)
+
+    for gen_mode, entry in report["modes"].items():
+        print("\n_______________________________________________")
+        print(f"MODE: {gen_mode}  engine: {LAYERS_ENGINE}  hull engine: {LAYERS_HULL_ENGINE}  "
+              f"prefilter: {LAYERS_PREFILTER}  dedup: {LAYERS_DEDUP}")
+        print(f"{'points':>8} {'layers':>7} {'median':>11} {'min':>11} {'peak KB':>11}")
+        for run in entry["runs"]:
+            print(f"{run['points']:>8} {run['layers']:>7} {run['median_seconds']:>10.4f}s "
+                  f"{run['min_seconds']:>10.4f}s {run['peak_kb']:>11.2f}")
+        if entry["exponent"] is not None:
+            print(f"Empirical exponent: time ~ n^{entry['exponent']:.2f}")
+
+    rows = check_regressions(report, baselines, SCALING_SLOWDOWN_THRESHOLD)
+    report["threshold"] = SCALING_SLOWDOWN_THRESHOLD
+    report["comparisons"] = [
+        {"mode": gen_mode, "requested_points": size, "median_seconds": seconds,
+         "baseline_seconds": baseline, "ratio": ratio, "regressed": regressed}
+        for gen_mode, size, seconds, baseline, ratio, regressed in rows
+    ]
+
+    if rows:
+        print("\n_______________________________________________")
+        print(f"Against baseline (fails above {SCALING_SLOWDOWN_THRESHOLD:.2f}x)")
+        for gen_mode, size, seconds, baseline, ratio, regressed in rows:
+            flag = "REGRESSION" if regressed else ""
+            print(f"{gen_mode:>9} {size:>8} {seconds:>10.4f}s vs {baseline:>10.4f}s {ratio:>8.2f}x {flag}")
+
+    with open(SCALING_BENCHMARK_OUTPUT, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {SCALING_BENCHMARK_OUTPUT}")
+
+    if any(regressed for *_, regressed in rows):
+        sys.exit(1)
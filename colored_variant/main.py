@@ -3,7 +3,11 @@ import time
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import tracemalloc
-from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+from convex_layers import iter_convex_layers
+from layer_cache import cached_convex_layers, default_cache
+from render_plan import HullCollection, build_render_plan, render_frames
+from export_animation import export_animation
+from point_generators import generate_collinear_points
 from config import *
 
 # For reproducibility
@@ -23,64 +27,14 @@ def generate_distinct_colors(n):
         colors.append(rgb)
     return colors
 
-def generate_grid_points(grid_size, x_range, y_range):
+def layer_color(i):
     """
-    Generate points in a grid format based on the specified grid size and ranges.
-    
-    Args:
-        grid_size (int): Number of points along one axis of the grid.
-        x_range (float): Maximum value for the x-coordinate.
-        y_range (float): Maximum value for the y-coordinate.
-    
-    Returns:
-        np.ndarray: Array of generated points in a grid.
-    """
-    x_values = np.linspace(0, x_range, grid_size)
-    y_values = np.linspace(0, y_range, grid_size)
-    
-    # Create a meshgrid of points
-    x_grid, y_grid = np.meshgrid(x_values, y_values)
-    
-    # Stack x and y coordinates into a single array of points
-    points = np.vstack([x_grid.ravel(), y_grid.ravel()]).T
-    return points
-
-def compute_convex_layers(points):
-    layers = []
-    remaining_points = points.copy()
-    used_indices = set()
-    
-    while len(remaining_points) > 0:
-        if len(remaining_points) >= 3:
-            hull = ConvexHull(remaining_points)
-            hull_points = remaining_points[hull.vertices]
-            layers.append(hull_points)
-            
-            # Remove hull points from remaining points
-            mask = np.ones(len(remaining_points), dtype=bool)
-            mask[hull.vertices] = False
-            remaining_points = remaining_points[mask]
-        else:
-            layers.append(remaining_points)
-            remaining_points = np.array([])
-    
-    return layers
-
-def generate_collinear_points(n, x_range=1000):
-    """
-    Generate n collinear points along the x-axis (y = 0).
-    
-    Args:
-        n (int): Number of points to generate.
-        x_range (float): The range of x-values for the points.
-    
-    Returns:
-        np.ndarray: Array of n collinear points along the x-axis.
+    Color of layer i: the evenly spread colors when the layer count is known,
+    golden-ratio hue steps while layers are peeled lazily.
     """
-    x = np.linspace(0, x_range, n)
-    y = np.linspace(500, 500, n)  # All y values are 0, hence collinear
-    return np.vstack([x, y]).T
-
+    if layer_colors is not None:
+        return layer_colors[i]
+    return plt.cm.hsv((i * 0.618033988749895) % 1.0)[:3]
 
 #def init():
 #    line.set_data([], [])
@@ -90,52 +44,30 @@ def generate_collinear_points(n, x_range=1000):
 def init():
     line.set_data([], [])
     scat.set_alpha(alphas)
-    return [scat, line] + hull_lines
+    return [scat, line]
 
-def animate(i):
-    global alphas, hull_lines
-    
-    if i >= len(convex_layers):
-        return [scat, line] + hull_lines
-        
-    layer = convex_layers[i]
-    is_last_layer = (i == len(convex_layers) - 1)
+def animate(frame):
+    global alphas
     
-    # Handle different cases based on number of points in layer
-    if len(layer) >= 3:
-        x = np.append(layer[:, 0], layer[0, 0])
-        y = np.append(layer[:, 1], layer[0, 1])
-    elif len(layer) == 2:
-        x = layer[:, 0]
-        y = layer[:, 1]
-    else:  # Single point
-        if is_last_layer:
-            line.set_data([], [])
-            point_idx = np.where((points == layer[0]).all(axis=1))[0][0]
-            # Convert colors to RGB tuples
-            current_colors = np.array([plt.cm.colors.to_rgb(POINTS_COLOR)] * len(points))
-            current_colors[point_idx] = layer_colors[i]
-            scat.set_color(current_colors)
-            return [scat, line] + hull_lines
-        else:
-            x = np.array([layer[0, 0], layer[0, 0]])
-            y = np.array([layer[0, 1], layer[0, 1]])
+    # frame is a render_plan.RenderFrame: the layer's indices and polyline
+    # are precomputed, so this only applies array updates
+    if frame.colors is not None:
+        # Last layer is a single point: show it in its layer color
+        line.set_data([], [])
+        scat.set_color(frame.colors)
+        return [scat, line]
     
     # Update the main line
-    line.set_data(x, y)
-    
-    # Find indices of current hull points
-    hull_indices = [np.where((points == point).all(axis=1))[0][0] for point in layer]
+    line.set_data(frame.x, frame.y)
     
     # Create or update hull line with the corresponding color
-    if len(layer) > 1:
-        hull_line, = ax.plot(x, y, color=layer_colors[i], lw=CHECKED_LINE_SIZE, alpha=1.0)
-        hull_lines.append(hull_line)
+    if len(frame.indices) > 1:
+        hull_lines.append(frame.x, frame.y, layer_color(frame.index))
     
     # Update scatter plot colors
     scat.set_color(POINTS_COLOR)
     
-    return [scat, line] + hull_lines
+    return [scat, line]
 
 for points_in_list in POINTS_LIST:
 
@@ -173,9 +105,27 @@ for points_in_list in POINTS_LIST:
 
     tracemalloc.start()
 
-    convex_layers = compute_convex_layers(points)
+    if LAZY_LAYERS:
+        # Layers are peeled while the animation plays
+        layer_colors = None
+
+        def frames(points=points):
+            layers = iter_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                        dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE, indices=True)
+            return render_frames(points, layers, POINTS_COLOR, layer_color)
+    else:
+        convex_layers = cached_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                             dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE, output="csr")
+        if LAYER_CACHE:
+            print(f"Layer cache: {default_cache().summary()}")
+
+        layer_colors = generate_distinct_colors(len(convex_layers))
+
+        # Everything animate() needs, worked out before the first frame
+        render_plan = build_render_plan(points, convex_layers, POINTS_COLOR, layer_color)
 
-    layer_colors = generate_distinct_colors(len(convex_layers))
+        def frames(render_plan=render_plan):
+            return iter(render_plan)
     
     # Animation setup
     fig, ax = plt.subplots(figsize=(X_WINDOW, Y_WINDOW))
@@ -194,19 +144,28 @@ for points_in_list in POINTS_LIST:
     line, = ax.plot([], [], 'r-', lw=LINE_SIZE, label='Current Layer')
     
     alphas = np.ones(len(points))
-    hull_lines = []
+    # Every layer's line, in one artist outside the blit artists
+    hull_lines = HullCollection(ax, linewidths=CHECKED_LINE_SIZE, alpha=1.0)
     
     if LET_ANIMATION:
         ani = FuncAnimation(
             fig, animate, 
-            frames=len(convex_layers), 
+            frames=frames, 
             init_func=init, blit=True, 
             interval=ANIMATION_INTERVAL_MS, 
-            repeat=False
+            repeat=False,
+            # There are at most as many layers as points
+            save_count=len(points),
+            cache_frame_data=False
         )
+        # Layer lines are drawn into the blit background, once each
+        hull_lines.bind(ani)
         
-    # Save the animation as GIF
-    ani.save(f"layers.gif", writer='pillow')
+    # Export the animation headlessly, on its own Agg figures
+    if EXPORT_ANIMATION:
+        export_animation(points, None if LAZY_LAYERS else convex_layers,
+                         EXPORT_PATH.format(points=len(points)), style="colored",
+                         title=TITLE_WINDOW, layer_colors=layer_colors)
     
     plt.tight_layout()
     plt.show()
@@ -10,6 +10,14 @@ RANDOM_SEED = 1330
 #POINTS_LIST = [1,5,10,50,100,250,500,1000,2000,3000,4000,5000,6000,7000,8000,9000,10000]
 POINTS_LIST = [50, 100, 1000, 5000, 10000]
 
+# main_tests.py: run the POINTS_LIST sweep as (size, mode, seed) jobs on a
+# process pool instead of the serial loop (no animation in that mode).
+# SWEEP_WORKERS = None uses every core.
+PARALLEL_SWEEP = False
+SWEEP_WORKERS = None
+SWEEP_GEN_MODES = ["random"]
+SWEEP_SEEDS_PER_SIZE = 1
+
 
 X_LIM = 1000
 Y_LIM = 1000
@@ -26,6 +34,88 @@ ANIMATION_INTERVAL_MS = 300
 # Options: 'grid', 'random', 'collinear'
 GEN_MODE = "grid"
 
+# Options: 'quickhull' (one QuickHull per layer), 'presorted' (sort once,
+# monotone chain over the survivors per layer), 'hull_tree' (peel every
+# layer out of one deletion-only hull tree), see convex_layers.py
+LAYERS_ENGINE = "quickhull"
+
+# Drop the points strictly inside the Akl-Toussaint octagon (extremes in x,
+# y, x + y, x - y) before each layer's hull; same layers, fewer candidates
+LAYERS_PREFILTER = False
+
+# Peel the distinct points only (one lexsort up front) and put every copy of
+# a repeated point into the same layer, instead of one copy per layer
+LAYERS_DEDUP = False
+
+# Hull engine of the 'quickhull' layer engine: any name registered in
+# hull_engines.py ('indexed', 'vectorized', 'reference', 'octagon',
+# 'monotone_chain'), or 'auto' to let the cost model pick one per layer
+LAYERS_HULL_ENGINE = "indexed"
+
+# Animate layers as they are peeled (iter_convex_layers) instead of
+# computing the whole onion first; the first frame then only waits for one
+# hull. The up-front time / memory printout is skipped in this mode.
+LAZY_LAYERS = False
+
+# benchmark_layers.py: sizes swept to find where 'hull_tree' overtakes
+# repeated QuickHull, and the largest size the reference engine is run at
+LAYERS_BENCHMARK_SIZES = [1000, 5000, 10000, 25000, 50000, 100000, 200000]
+LAYERS_BENCHMARK_REFERENCE_MAX = 5000
+
+# benchmark_scaling.py: timed sweep of LAYERS_ENGINE over every generator
+# mode, compared against grid_stats_10k / random_stats_10k (and, if set, a
+# JSON report from an earlier run). It exits non-zero when a run is more
+# than SCALING_SLOWDOWN_THRESHOLD times slower than its baseline.
+SCALING_BENCHMARK_MODES = ["grid", "random", "collinear"]
+SCALING_BENCHMARK_SIZES = [100, 1000, 2000, 5000, 10000]
+SCALING_BENCHMARK_REPEATS = 5
+SCALING_BENCHMARK_WARMUP = 1
+SCALING_BENCHMARK_OUTPUT = "scaling_benchmark.json"
+SCALING_BASELINE_JSON = None
+SCALING_SLOWDOWN_THRESHOLD = 1.5
+SCALING_MIN_BASELINE_SECONDS = 0.01
+
+# out_of_core_hull.py: rows of the memory-mapped point file read per chunk
+OUT_OF_CORE_CHUNK_SIZE = 1_000_000
+
+# sharded_hull.py: worker processes hulling the shards of one point array
+# (None = every core)
+SHARDED_HULL_WORKERS = None
+
+# hull_engines.py: 'auto' engine selection. HULL_ENGINE_COSTS is the cost
+# model written by 'python hull_engines.py calibrate' (built-in defaults
+# until then), fitted to runs at HULL_CALIBRATION_SIZES. The shape and hull
+# size of an input are estimated from HULL_AUTO_SAMPLE random points; a
+# sample with fewer than HULL_AUTO_GRID_DISTINCT times its size distinct x
+# (or y) values counts as a grid.
+HULL_ENGINE_COSTS = "hull_engine_costs.json"
+HULL_CALIBRATION_SIZES = [250, 1000, 4000, 16000, 64000]
+HULL_AUTO_SAMPLE = 1024
+HULL_AUTO_GRID_DISTINCT = 0.9
+
+# export_animation.py: headless GIF / MP4 export of the layers animation,
+# rendered with Agg on EXPORT_WORKERS processes (None = every core).
+# EXPORT_FRAME_STEP renders every n-th layer; EXPORT_MAX_FRAMES caps the
+# frame count of long onions by raising that step. EXPORT_ANIMATION makes
+# main.py and colored_variant/main.py export every run; {points} in
+# EXPORT_PATH is replaced by the point count.
+EXPORT_ANIMATION = False
+EXPORT_PATH = "convex_layers_{points}.gif"
+EXPORT_FPS = 10
+EXPORT_WORKERS = None
+EXPORT_FRAME_STEP = 1
+EXPORT_MAX_FRAMES = 600
+EXPORT_DPI = 50
+
+# layer_cache.py: keep computed layers in LAYER_CACHE_DIR as compressed .npz
+# files, keyed by a hash of the points and the peeling arguments, so reruns
+# of the same (mode, size, seed) load instead of recomputing. The least
+# recently used entries are deleted past LAYER_CACHE_MAX_BYTES. The timed
+# benchmarks never use it.
+LAYER_CACHE = False
+LAYER_CACHE_DIR = ".layer_cache"
+LAYER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 # this is really bad, don't change it.
 # in the main.py window caption should be changed such that for each number in
 # POINTS_LIST will have a diff caption
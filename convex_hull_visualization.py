@@ -3,7 +3,7 @@ import time
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import tracemalloc
-from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+from convex_layers import compute_convex_layers
 import config
 
 def generate_points(points_in_list):
@@ -18,32 +18,6 @@ def generate_points(points_in_list):
     points = np.random.rand(points_in_list, 2) * config.POINTS_RANGE
     return points
 
-def compute_convex_layers(points):
-    """
-    Compute convex hull layers with optional 1-2 point handling
-    """
-    layers = []
-    remaining_points = points.copy()
-    
-    while len(remaining_points) > 0:
-        if len(remaining_points) >= 3:
-            # Normal convex hull computation for 3 or more points
-            hull = ConvexHull(remaining_points)
-            layers.append(remaining_points[hull.vertices])
-            remaining_points = np.delete(remaining_points, hull.vertices, axis=0)
-        else:
-            # Handle cases with 1 or 2 points based on configuration
-            if config.PERMIT_1_OR_2_REMAINING_POINTS:
-                if len(remaining_points) == 2:
-                    # For 2 points, create a degenerate hull (line)
-                    layers.append(remaining_points)
-                elif len(remaining_points) == 1:
-                    # For 1 point, add it as a single-point layer
-                    layers.append(remaining_points)
-            remaining_points = np.array([])  # Clear remaining points
-            
-    return layers
-
 def create_animation(points):
     """
     Create and display the convex hull layers animation
@@ -145,7 +119,13 @@ def create_animation(points):
     # Compute convex layers
     tracemalloc.start()
     start_time = time.time()
-    convex_layers = compute_convex_layers(points)
+    convex_layers = compute_convex_layers(
+        points,
+        engine=config.LAYERS_ENGINE,
+        prefilter=config.LAYERS_PREFILTER,
+        dedup=config.LAYERS_DEDUP, hull_engine=config.LAYERS_HULL_ENGINE,
+        permit_1_or_2_remaining=config.PERMIT_1_OR_2_REMAINING_POINTS
+    )
     end_time = time.time()
     snapshot_after = tracemalloc.take_snapshot()
 
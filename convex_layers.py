@@ -0,0 +1,509 @@
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import nullcontext
+
+import numpy as np
+from convexhull_quickhull_implementation import octagon_prefilter
+from hull_engines import ConvexHull, _monotone_chain, default_cost_model, sample_shape
+from hull_stats import HullStats
+from point_dedup import DeduplicatedPoints
+from predicates import lexicographic_extremes, orientation_bound, orientation_sign
+
+# 'quickhull' recomputes a full hull for every layer, 'presorted' sorts once
+# and runs a monotone chain over the surviving points per layer, 'hull_tree'
+# peels all layers out of one deletion-only hull tree.
+LAYER_ENGINES = ("quickhull", "presorted", "hull_tree")
+
+# 'coordinates' returns one (k, 2) coordinate array per layer, 'csr' a
+# single ConvexLayersCSR of point indices (no coordinate copies)
+LAYER_OUTPUTS = ("coordinates", "csr")
+
+
+def compute_convex_layers(points, engine="quickhull", hull_engine="indexed",
+                          permit_1_or_2_remaining=True, stats=None, prefilter=False,
+                          output="coordinates", dedup=False):
+    """
+    Compute convex layers (onion peeling) of a set of points.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2)
+    engine (str): Layer engine, one of LAYER_ENGINES
+    hull_engine (str): Hull engine of the 'quickhull' path: a name
+        registered in hull_engines, or 'auto' to pick one per layer
+    permit_1_or_2_remaining (bool): Keep a final layer of 1 or 2 leftover points
+    stats (hull_stats.LayerStats): Optional; receives one record per layer
+        (and per-hull counters on the 'quickhull' path)
+    prefilter (bool): Run the Akl-Toussaint octagon prefilter on every
+        layer's remaining points ('quickhull' and 'presorted'; 'hull_tree'
+        only ever touches hull points and ignores it)
+    output (str): Result format, one of LAYER_OUTPUTS
+    dedup (bool): Peel the distinct points only and put every copy of a
+        repeated point into its coordinates' layer (see _peel_deduplicated);
+        by default copies are peeled one per layer
+
+    Returns list of (k, 2) arrays, outermost layer first, or a
+    ConvexLayersCSR with output='csr'
+    """
+    if engine not in LAYER_ENGINES:
+        raise ValueError(f"Unknown layer engine: {engine}")
+    if output not in LAYER_OUTPUTS:
+        raise ValueError(f"Unknown layer output: {output}")
+
+    points = np.asarray(points)
+    layer_indices = list(_peel(points, engine, hull_engine, permit_1_or_2_remaining, stats, prefilter, dedup))
+
+    if output == "csr":
+        return ConvexLayersCSR(layer_indices, len(points))
+    return [points[layer] for layer in layer_indices]
+
+
+def iter_convex_layers(points, engine="quickhull", hull_engine="indexed",
+                       permit_1_or_2_remaining=True, stats=None, prefilter=False,
+                       indices=False, dedup=False):
+    """
+    Lazy compute_convex_layers: yields every layer as soon as it is peeled.
+
+    The first layer costs one hull instead of the whole onion, and nothing
+    deeper is computed once the caller stops iterating. Arguments are the
+    same as compute_convex_layers, plus:
+
+    indices (bool): Yield index arrays into points instead of coordinates
+
+    Yields (k, 2) arrays (or index arrays), outermost layer first
+    """
+    if engine not in LAYER_ENGINES:
+        raise ValueError(f"Unknown layer engine: {engine}")
+
+    points = np.asarray(points)
+    for layer in _peel(points, engine, hull_engine, permit_1_or_2_remaining, stats, prefilter, dedup):
+        yield layer if indices else points[layer]
+
+
+def layer_frames(layers):
+    """
+    FuncAnimation frames over convex layers: yields (i, layer, is_last).
+
+    Works on a list or on iter_convex_layers; to know whether a layer is the
+    last one it looks one layer ahead.
+    """
+    layers = iter(layers)
+    current = next(layers, None)
+    i = 0
+    while current is not None:
+        following = next(layers, None)
+        yield i, current, following is None
+        current = following
+        i += 1
+
+
+def _peel(points, engine, hull_engine, permit_1_or_2_remaining, stats, prefilter, dedup=False):
+    """Layer generator of the selected engine, yielding index arrays."""
+    if dedup:
+        return _peel_deduplicated(points, engine, hull_engine, permit_1_or_2_remaining, stats, prefilter)
+    elif engine == "hull_tree":
+        return _peel_hull_tree(points, permit_1_or_2_remaining, stats)
+    elif engine == "presorted":
+        return _peel_presorted(points, permit_1_or_2_remaining, stats, prefilter)
+    else:
+        return _peel_quickhull(points, hull_engine, permit_1_or_2_remaining, stats, prefilter)
+
+
+class ConvexLayersCSR:
+    """
+    Convex layers as index arrays in compressed (CSR-style) form.
+
+    Attributes:
+        indices (numpy.ndarray): Point indices of every layer in peel order,
+            each layer ordered like its hull (clockwise from the leftmost
+            point); int32 unless n needs int64
+        offsets (numpy.ndarray): Layer i is indices[offsets[i]:offsets[i + 1]]
+        depth (numpy.ndarray): Layer of every input point (0 = outermost),
+            -1 for points left out of every layer; int16 while the layer
+            count fits, int32 otherwise
+
+    Layers are slices of indices, so reading them copies nothing.
+    """
+
+    def __init__(self, layer_indices, n):
+        index_dtype = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+        sizes = np.fromiter((len(layer) for layer in layer_indices), dtype=np.int64,
+                            count=len(layer_indices))
+        self.offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+
+        self.indices = np.empty(self.offsets[-1], dtype=index_dtype)
+        for i, layer in enumerate(layer_indices):
+            self.indices[self.offsets[i]:self.offsets[i + 1]] = layer
+
+        depth_dtype = np.int16 if len(sizes) <= np.iinfo(np.int16).max else np.int32
+        self.depth = np.full(n, -1, dtype=depth_dtype)
+        self.depth[self.indices] = np.repeat(np.arange(len(sizes), dtype=depth_dtype), sizes)
+
+    @classmethod
+    def from_arrays(cls, indices, offsets, depth):
+        """Rebuild from stored indices / offsets / depth arrays (no copies)."""
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(indices):
+            raise ValueError("Offsets do not match indices")
+        layers = cls.__new__(cls)
+        layers.indices = indices
+        layers.offsets = offsets
+        layers.depth = depth
+        return layers
+
+    def layer(self, i):
+        """Point indices of layer i (a view into indices)."""
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def layer_points(self, points, i):
+        """Coordinates of layer i, like one entry of the 'coordinates' output."""
+        return np.asarray(points)[self.layer(i)]
+
+    def __iter__(self):
+        """Index arrays of the layers, outermost first (views)."""
+        for i in range(len(self)):
+            yield self.layer(i)
+
+    def __len__(self):
+        """Return number of layers"""
+        return len(self.offsets) - 1
+
+
+def _phase(stats, name):
+    """Timer for an engine set-up phase, a no-op without stats."""
+    if stats is None:
+        return nullcontext()
+    return stats.phase(name)
+
+
+def _peel_deduplicated(points, engine, hull_engine, permit_1_or_2_remaining=True, stats=None,
+                       prefilter=False):
+    """
+    Peel the distinct points with the selected engine, then hand every
+    layer out with all copies of its points (next to each other, in hull
+    order).
+
+    Without it, each engine peels one copy of a repeated point per layer,
+    so a point read k times sits in k layers. Here the copies share one
+    layer, every hull runs on fewer points, and the 1 or 2 leftover points
+    rule counts distinct points. stats counts distinct points as well.
+
+    Yields index arrays into points, one per layer
+    """
+    with _phase(stats, "dedup"):
+        duplicates = DeduplicatedPoints(points)
+    for layer in _peel(duplicates.points, engine, hull_engine, permit_1_or_2_remaining, stats, prefilter):
+        yield duplicates.copies(layer)
+
+
+def _peel_quickhull(points, hull_engine, permit_1_or_2_remaining=True, stats=None, prefilter=False):
+    """
+    Repeated hull: one full hull computation per layer.
+
+    With hull_engine='auto' the input is sampled once (hull_engines.
+    sample_shape) and the cost model picks the engine of every layer from
+    the points still alive, taking the previous layer's size as the hull
+    size: QuickHull while the layers are small next to what is left, the
+    monotone chain once QuickHull's per-vertex cost would dominate.
+
+    Yields index arrays into points, one per layer
+    """
+    remaining = np.arange(len(points))
+    if hull_engine == "auto":
+        model = default_cost_model()
+        shape, hull_size = sample_shape(points)
+
+    while len(remaining) > 0:
+        if stats is not None:
+            start_time = time.perf_counter()
+        alive = len(remaining)
+        hull_stats = None
+        engine = None
+        if alive >= 3:
+            if stats is not None:
+                hull_stats = HullStats()
+            engine = hull_engine
+            if hull_engine == "auto":
+                engine = model.choose(alive, hull_size, shape)
+            hull = ConvexHull(points[remaining], engine=engine, stats=hull_stats, prefilter=prefilter)
+            vertices = hull.vertices
+            if len(vertices) == 1:
+                # On one vertical line a hull collapses to its lowest point;
+                # the layer takes both ends, like every other layer engine
+                # (and like a horizontal remnant), so the layers stay nested
+                vertices = np.unique(lexicographic_extremes(points[remaining]))
+            layer = remaining[vertices]
+            remaining = np.delete(remaining, vertices)
+            if hull_engine == "auto":
+                hull_size = len(layer)
+        else:
+            # 1 or 2 points left: they form the last (degenerate) layer
+            if not permit_1_or_2_remaining:
+                break
+            layer = remaining
+            remaining = remaining[:0]
+        if stats is not None:
+            stats.add_layer(alive, len(layer), time.perf_counter() - start_time, hull_stats, engine)
+        yield layer
+
+
+def _peel_presorted(points, permit_1_or_2_remaining=True, stats=None, prefilter=False):
+    """
+    Sort once, then build every layer with a monotone-chain pass over the
+    survivors of that single ordering.
+
+    The only per-layer state is an alive mask over the sorted order; no
+    coordinates are copied or deleted between layers, and each layer costs
+    one linear scan of the surviving points.
+
+    Yields index arrays into points, one per layer
+    """
+    with _phase(stats, "sort"):
+        points = np.asarray(points, dtype=float)
+        # lexsort is stable: copies of a point stay in index order, and the
+        # chains keep the first, the lowest index as on the other engines
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        xs = points[order, 0]
+        ys = points[order, 1]
+        alive = np.ones(len(points), dtype=bool)
+        # Holds for every subset, so one bound serves all layers
+        bound = orientation_bound(points)
+
+    remaining = len(points)
+    while remaining > 0:
+        if stats is not None:
+            start_time = time.perf_counter()
+        survivors = np.flatnonzero(alive)
+        if remaining < 3:
+            if permit_1_or_2_remaining:
+                if stats is not None:
+                    stats.add_layer(remaining, remaining, time.perf_counter() - start_time)
+                yield np.sort(order[survivors])
+            break
+
+        if prefilter:
+            # Positions stay sorted, so the chains can run on the candidates
+            survivors = survivors[octagon_prefilter(np.column_stack((xs[survivors], ys[survivors])))]
+
+        upper = _monotone_chain(xs, ys, survivors, upper=True, bound=bound)
+        lower = _monotone_chain(xs, ys, survivors, upper=False, bound=bound)
+
+        # Clockwise from the leftmost point: along the upper chain, then back
+        # along the lower chain without repeating its two endpoints.
+        layer = np.concatenate((upper, lower[-2:0:-1]))
+        alive[layer] = False
+        if stats is not None:
+            stats.add_layer(remaining, len(layer), time.perf_counter() - start_time)
+        remaining -= len(layer)
+        yield order[layer]
+
+
+def _peel_hull_tree(points, permit_1_or_2_remaining=True, stats=None):
+    """
+    Peel all layers out of two deletion-only hull trees (upper and lower).
+
+    Every point is inserted once and deleted once; a deletion only rebuilds
+    the tree nodes whose hull contained the point, so the whole onion costs
+    O(n log n) merges instead of one full hull per layer. Layers come out in
+    the same order as the QuickHull path: clockwise, starting at the
+    leftmost point.
+
+    Yields index arrays into points, one per layer
+    """
+    if len(points) == 0:
+        return
+
+    with _phase(stats, "build"):
+        # The tree works on distinct coordinates in (x, y) order (np.unique
+        # sorts rows lexicographically). Repeated coordinates are handed out
+        # one copy per layer, lowest input index first, like the QuickHull path.
+        unique_points, inverse, counts = np.unique(
+            np.asarray(points, dtype=float), axis=0, return_inverse=True, return_counts=True)
+        copies = np.argsort(inverse.ravel(), kind="stable")
+        first_copy = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        taken = np.zeros(len(unique_points), dtype=np.intp)
+
+        n = len(unique_points)
+        xs = unique_points[:, 0].tolist()
+        ys = unique_points[:, 1].tolist()
+
+        # The lower hull is the upper hull of the points rotated by 180
+        # degrees, whose sorted order is simply the reversed rank order.
+        upper = _UpperHullTree(xs, ys)
+        lower = _UpperHullTree([-x for x in reversed(xs)], [-y for y in reversed(ys)])
+
+    alive = len(points)
+    while alive > 0:
+        if stats is not None:
+            start_time = time.perf_counter()
+        if alive < 3:
+            # Same as the QuickHull path: the leftover points form the last
+            # layer, in input order. The upper hull of 1 or 2 distinct
+            # points is every point.
+            if permit_1_or_2_remaining:
+                leftover = [copies[first_copy[r] + taken[r]:first_copy[r] + counts[r]]
+                            for r in upper.hull()]
+                if stats is not None:
+                    stats.add_layer(alive, alive, time.perf_counter() - start_time)
+                yield np.sort(np.concatenate(leftover))
+            break
+
+        upper_chain = upper.hull()
+        lower_chain = [n - 1 - r for r in lower.hull()]
+        ranks = np.array(upper_chain + lower_chain[1:-1])
+        layer = copies[first_copy[ranks] + taken[ranks]]
+
+        taken[ranks] += 1
+        exhausted = ranks[taken[ranks] == counts[ranks]].tolist()
+        upper.delete(exhausted)
+        lower.delete([n - 1 - r for r in exhausted])
+        if stats is not None:
+            stats.add_layer(alive, len(ranks), time.perf_counter() - start_time)
+        alive -= len(ranks)
+        yield layer
+
+
+class _UpperHullTree:
+    """
+    Deletion-only upper hull of points given in (x, y) sorted order.
+
+    A complete binary tree over the ranks. Every node keeps the upper hull
+    of its alive points (a list of ranks, left to right, collinear points
+    dropped) and the bridge joining the hulls of its two children. A node's
+    hull is never mutated in place, so unchanged children are shared with
+    their parent without copying.
+    """
+
+    def __init__(self, xs, ys):
+        self.xs = xs
+        self.ys = ys
+        n = len(xs)
+        size = 1
+        while size < n:
+            size *= 2
+        self.size = size
+        self.n = n
+        # Error bound of the exact turn tests in _bridge
+        self.bound = orientation_bound(np.column_stack((xs, ys)))
+
+        empty = []
+        self.hulls = [empty] * (2 * size)
+        # hull(v) keeps the left child's ranks <= bridge_left[v] and the
+        # right child's ranks >= bridge_right[v]
+        self.bridge_left = [n] * (2 * size)
+        self.bridge_right = [-1] * (2 * size)
+
+        for r in range(n):
+            self.hulls[size + r] = [r]
+        for v in range(size - 1, 0, -1):
+            self._merge(v)
+
+    def hull(self):
+        """Ranks of the current upper hull, left to right."""
+        return self.hulls[1]
+
+    def delete(self, ranks):
+        """
+        Delete a batch of ranks and repair every node whose hull held one.
+        """
+        size = self.size
+        hulls = self.hulls
+        bridge_left = self.bridge_left
+        bridge_right = self.bridge_right
+
+        dirty = set()
+        for r in ranks:
+            v = size + r
+            hulls[v] = []
+            # Climb while r was on the parent's hull; a point that is not on
+            # a node's hull is not on any ancestor's hull either.
+            while v > 1:
+                parent = v >> 1
+                if v & 1:
+                    on_hull = r >= bridge_right[parent]
+                else:
+                    on_hull = r <= bridge_left[parent]
+                if not on_hull:
+                    break
+                dirty.add(parent)
+                v = parent
+
+        # Children have larger ids than parents, so this is bottom-up
+        deleted = set(ranks)
+        for v in sorted(dirty, reverse=True):
+            if bridge_left[v] in deleted or bridge_right[v] in deleted:
+                self._merge(v)
+            else:
+                # Both bridge endpoints survived, and the old bridge still
+                # supports the (smaller) children: only the chains changed.
+                left = hulls[2 * v]
+                right = hulls[2 * v + 1]
+                hulls[v] = (left[:bisect_right(left, bridge_left[v])] +
+                            right[bisect_left(right, bridge_right[v]):])
+
+    def _merge(self, v):
+        """
+        Rebuild hull(v) from the hulls of its two children.
+        """
+        left = self.hulls[2 * v]
+        right = self.hulls[2 * v + 1]
+        if not right:
+            self.hulls[v] = left
+            self.bridge_left[v] = self.n
+            self.bridge_right[v] = self.n
+        elif not left:
+            self.hulls[v] = right
+            self.bridge_left[v] = -1
+            self.bridge_right[v] = -1
+        else:
+            i, j = self._bridge(left, right)
+            self.hulls[v] = left[:i + 1] + right[j:]
+            self.bridge_left[v] = left[i]
+            self.bridge_right[v] = right[j]
+
+    def _bridge(self, left, right):
+        """
+        Upper bridge between two upper hulls separated in rank order, by
+        nested binary search: O(log h_left * log h_right).
+
+        Returns positions (i, j) so that hull = left[:i + 1] + right[j:]
+        """
+        xs, ys = self.xs, self.ys
+        bound = self.bound
+        last_left = len(left) - 1
+        lo, hi = 0, len(right)
+        while True:
+            # Outer search over right; the final pass (lo == hi - 1 after
+            # the loop) only computes the tangent for the answer.
+            mid = (lo + hi - 1) // 2 if hi - lo > 1 else lo
+            b = right[mid]
+            bx, by = xs[b], ys[b]
+
+            # Tangent point on left seen from b: the first vertex whose
+            # outgoing edge has b on or above it.
+            tlo, thi = 0, last_left
+            while tlo < thi:
+                tmid = (tlo + thi) // 2
+                p, q = left[tmid], left[tmid + 1]
+                px, py = xs[p], ys[p]
+                turn = (xs[q] - px) * (by - py) - (ys[q] - py) * (bx - px)
+                if abs(turn) <= bound:
+                    turn = orientation_sign(px, py, xs[q], ys[q], bx, by)
+                if turn >= 0:
+                    thi = tmid
+                else:
+                    tlo = tmid + 1
+
+            if hi - lo <= 1:
+                return tlo, mid
+
+            # right[mid] stays on the hull iff the next vertex turns strictly
+            # clockwise after the tangent line a -> b
+            a, c = left[tlo], right[mid + 1]
+            ax, ay = xs[a], ys[a]
+            turn = (bx - ax) * (ys[c] - ay) - (by - ay) * (xs[c] - ax)
+            if abs(turn) <= bound:
+                turn = orientation_sign(ax, ay, bx, by, xs[c], ys[c])
+            if turn < 0:
+                hi = mid + 1
+            else:
+                lo = mid + 1
@@ -0,0 +1,219 @@
+import numpy as np
+from convex_layers import _UpperHullTree
+from hull_engines import ConvexHull, _sorted_hull
+
+
+class DynamicConvexHull:
+    def __init__(self, hull):
+        """
+        Convex hull of a point set that changes one point at a time.
+
+        The points are kept in blocks of at most 2^i distinct points
+        (logarithmic method): each block is a pair of deletion-only hull
+        trees, the same _UpperHullTree the 'hull_tree' layer engine uses.
+        An insertion merges the full low blocks with the new point into the
+        next free level, so a point is rebuilt O(log n) times in total; a
+        deletion only repairs the tree nodes of its own block that held it.
+        Once as many points have been deleted as are alive, everything is
+        rebuilt into one block.
+
+        vertices and area are recomputed on first access after a change,
+        from the hull vertices of the (at most log n) blocks only, so no
+        update or query touches every point.
+
+        Parameters:
+        hull (hull_engines.ConvexHull or ConvexHull_QuickHull): Seed; its points become ids 0 to n - 1
+            and its vertices / area serve the first queries
+
+        Attributes:
+        points (numpy.ndarray): Coordinates of every id ever used, shape
+            (ids, 2); rows of deleted points stay in place
+        """
+        # Ids of every alive copy of a coordinate pair, and its block
+        self._copies = {}
+        self._block_of = {}
+        self._blocks = []
+        self._deleted = 0
+        self._vertices = None
+        self._area = None
+        self._points = None
+
+        points = np.asarray(hull.points, dtype=float)
+        self._xs = points[:, 0].tolist()
+        self._ys = points[:, 1].tolist()
+        for i, key in enumerate(zip(self._xs, self._ys)):
+            self._copies.setdefault(key, []).append(i)
+        self._count = len(points)
+        self._build(list(self._copies))
+
+        # Same vertex convention as after an update: the lowest id of a
+        # repeated point
+        self._vertices = np.array([min(self._copies[self._key(i)]) for i in hull.vertices], dtype=np.intp)
+        self._area = hull.area
+
+    @classmethod
+    def from_points(cls, points, engine="indexed"):
+        """Seed from a new hull of points with a registered hull engine."""
+        return cls(ConvexHull(points, engine=engine))
+
+    def _key(self, i):
+        return (self._xs[i], self._ys[i])
+
+    def _build(self, keys):
+        """Put keys into one block at the smallest level that fits them."""
+        level = max(len(keys) - 1, 0).bit_length()
+        while len(self._blocks) <= level:
+            self._blocks.append(None)
+        block = _HullBlock(keys)
+        self._blocks[level] = block
+        for key in keys:
+            self._block_of[key] = block
+
+    def insert(self, point):
+        """
+        Add a point.
+
+        Returns int: the new point's id
+        """
+        i = len(self._xs)
+        x, y = float(point[0]), float(point[1])
+        self._xs.append(x)
+        self._ys.append(y)
+        self._points = None
+        self._vertices = None
+        self._count += 1
+
+        key = (x, y)
+        if key in self._copies:
+            # A repeated coordinate changes no block
+            self._copies[key].append(i)
+            return i
+        self._copies[key] = [i]
+
+        # Binary counter: merge the occupied low levels with the new point
+        keys = [key]
+        level = 0
+        while level < len(self._blocks) and self._blocks[level] is not None:
+            block = self._blocks[level]
+            keys.extend(block.alive_keys())
+            self._deleted -= len(block.keys) - block.alive
+            self._blocks[level] = None
+            level += 1
+        self._build(keys)
+        return i
+
+    def delete(self, i):
+        """Remove the point with id i."""
+        key = self._key(i)
+        copies = self._copies.get(key)
+        if copies is None or i not in copies:
+            raise KeyError(f"Unknown point id: {i}")
+        copies.remove(i)
+        self._vertices = None
+        self._count -= 1
+        if copies:
+            return
+
+        del self._copies[key]
+        block = self._block_of.pop(key)
+        block.delete(key)
+        self._deleted += 1
+        if block.alive == 0:
+            self._deleted -= len(block.keys)
+            self._blocks[self._blocks.index(block)] = None
+        elif self._deleted > len(self._copies):
+            # Global rebuild: keep dead points from outnumbering live ones
+            self._blocks = []
+            self._deleted = 0
+            self._build(list(self._copies))
+
+    def _update(self):
+        """
+        Hull of the blocks' hull vertices: one monotone chain over their
+        (x, y) order, like a layer of the 'presorted' engine.
+        """
+        keys = set()
+        for block in self._blocks:
+            if block is not None:
+                keys.update(block.hull_keys())
+        if not keys:
+            self._vertices = np.empty(0, dtype=np.intp)
+            self._area = 0.0
+            return
+
+        keys = sorted(keys)
+        xs = np.array([key[0] for key in keys])
+        ys = np.array([key[1] for key in keys])
+        if xs[0] == xs[-1]:
+            # All on one vertical line: the lowest point only, as
+            # ConvexHull_QuickHull reports it
+            hull = np.zeros(1, dtype=np.intp)
+        else:
+            hull = _sorted_hull(xs, ys)
+
+        self._vertices = np.array([min(self._copies[keys[r]]) for r in hull], dtype=np.intp)
+        x = xs[hull]
+        y = ys[hull]
+        self._area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+
+    @property
+    def vertices(self):
+        """Ids of the hull vertices, ordered like ConvexHull_QuickHull."""
+        if self._vertices is None:
+            self._update()
+        return self._vertices
+
+    @property
+    def area(self):
+        if self._vertices is None:
+            self._update()
+        return self._area
+
+    @property
+    def points(self):
+        if self._points is None:
+            self._points = np.column_stack((self._xs, self._ys))
+        return self._points
+
+    @property
+    def count(self):
+        """Number of alive points (copies included)."""
+        return self._count
+
+    def __len__(self):
+        """Return number of vertices in convex hull"""
+        return len(self.vertices)
+
+
+class _HullBlock:
+    """
+    Fixed set of distinct points with deletions: an upper and a lower
+    _UpperHullTree over their (x, y) order, as in _peel_hull_tree.
+    """
+
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.rank = {key: r for r, key in enumerate(self.keys)}
+        xs = [key[0] for key in self.keys]
+        ys = [key[1] for key in self.keys]
+        self.upper = _UpperHullTree(xs, ys)
+        # The lower hull is the upper hull rotated by 180 degrees
+        self.lower = _UpperHullTree([-x for x in reversed(xs)], [-y for y in reversed(ys)])
+        self.dead = set()
+        self.alive = len(self.keys)
+
+    def delete(self, key):
+        r = self.rank[key]
+        self.upper.delete([r])
+        self.lower.delete([len(self.keys) - 1 - r])
+        self.dead.add(r)
+        self.alive -= 1
+
+    def alive_keys(self):
+        return [key for r, key in enumerate(self.keys) if r not in self.dead]
+
+    def hull_keys(self):
+        """Keys of the block's hull vertices (upper chain, then lower chain)."""
+        n = len(self.keys)
+        ranks = self.upper.hull() + [n - 1 - r for r in self.lower.hull()]
+        return [self.keys[r] for r in ranks]
@@ -0,0 +1,311 @@
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import hsv
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from PIL import Image
+
+from layer_cache import cached_convex_layers
+from point_generators import generate_points
+from render_plan import build_render_plan
+from config import *
+
+# 'checked': main.py look (faded verified points, gray verified hulls, last
+# layer highlighted); 'colored': colored_variant/main.py look (every hull in
+# its own layer color)
+EXPORT_STYLES = ("checked", "colored")
+
+
+def golden_layer_color(i):
+    """Layer color used when no color list is given: golden-ratio hue steps."""
+    return hsv((i * 0.618033988749895) % 1.0)[:3]
+
+
+def select_frames(count, frame_step=1, max_frames=None):
+    """
+    Layer numbers to render for an onion of `count` layers.
+
+    Every frame_step-th layer is kept; with max_frames set, the step grows
+    until at most that many frames remain. The last layer is always kept.
+    Skipped layers still show up as verified hulls in the next frame.
+    """
+    if count == 0:
+        return []
+    step = max(1, frame_step)
+    if max_frames is not None and max_frames > 0:
+        step = max(step, math.ceil(count / max_frames))
+    selected = list(range(0, count, step))
+    if selected[-1] != count - 1:
+        selected.append(count - 1)
+    return selected
+
+
+class FrameRenderer:
+    def __init__(self, points, plan, style="checked", title=None, dpi=EXPORT_DPI, layer_colors=None):
+        """
+        Draws any frame of a render plan on its own Agg figure, no display
+        needed.
+
+        A frame's state is worked out from the plan directly instead of by
+        replaying the frames before it, so frames can be rendered in any
+        order and split across processes.
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+        plan (list): RenderFrames from build_render_plan
+        style (str): One of EXPORT_STYLES
+        title (str): Axes title, if any
+        dpi (int): Figure resolution; the size is X_WINDOW x Y_WINDOW inches
+        layer_colors (list): Per-layer colors for the 'colored' style
+        """
+        if style not in EXPORT_STYLES:
+            raise ValueError(f"Unknown export style: {style}")
+        self.points = np.asarray(points)
+        self.plan = plan
+        self.style = style
+        self.layer_colors = layer_colors
+
+        # Layer a point fades at; points of the last layer never fade
+        self._fade_at = np.full(len(self.points), len(plan))
+        for frame in plan:
+            if not frame.is_last:
+                self._fade_at[frame.indices] = frame.index
+        self._polylines = [np.column_stack((frame.x, frame.y)) for frame in plan]
+
+        self.figure = Figure(figsize=(X_WINDOW, Y_WINDOW), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot()
+        ax.set_xlim(0, X_LIM)
+        ax.set_ylim(0, Y_LIM)
+        if title is not None:
+            ax.set_title(title)
+
+        # Explicit z-order: hulls under the points, the current layer on top
+        if style == "checked":
+            self.verified = LineCollection([], colors=CHECKED_HULL_COLOR, linewidths=1, alpha=0.4, zorder=1)
+            ax.add_collection(self.verified, autolim=False)
+            self.previous, = ax.plot([], [], CHECKED_HULL_COLOR, lw=1, alpha=0.6, zorder=1)
+            self.last, = ax.plot([], [], CURRENT_HULL_COLOR, lw=2, alpha=1.0, zorder=3)
+        else:
+            self.verified = LineCollection([], linewidths=LINE_SIZE, alpha=1.0, zorder=1)
+            ax.add_collection(self.verified, autolim=False)
+        self.scat = ax.scatter(self.points[:, 0], self.points[:, 1], c=POINTS_COLOR, s=POINT_SIZE, zorder=2)
+        self.line, = ax.plot([], [], 'r-', lw=LINE_SIZE, zorder=3)
+
+    def _layer_color(self, i):
+        if self.layer_colors is not None:
+            return self.layer_colors[i]
+        return golden_layer_color(i)
+
+    def _set_checked_state(self, frame):
+        k = frame.index
+        if frame.is_last:
+            # The last layer is drawn apart; the one before it stays 'previous'
+            verified, previous = k - 1, k - 1
+            if len(frame.indices) > 1:
+                self.last.set_data(frame.x, frame.y)
+            else:
+                self.last.set_data([], [])
+        else:
+            verified, previous = k, k
+            self.last.set_data([], [])
+        self.verified.set_segments([p for p in self._polylines[:verified] if len(p)])
+        if previous >= 0:
+            self.previous.set_data(self.plan[previous].x, self.plan[previous].y)
+        else:
+            self.previous.set_data([], [])
+
+        self.scat.set_color(frame.colors if frame.colors is not None else POINTS_COLOR)
+        self.scat.set_alpha(np.where(self._fade_at <= k, 0.5, 1.0))
+
+    def _set_colored_state(self, frame):
+        k = frame.index
+        shown = [j for j in range(k + 1) if len(self.plan[j].indices) > 1]
+        self.verified.set_segments([self._polylines[j] for j in shown])
+        self.verified.set_color([self._layer_color(j) for j in shown])
+        self.scat.set_color(frame.colors if frame.colors is not None else POINTS_COLOR)
+
+    def render(self, k):
+        """
+        Draw frame k of the plan.
+
+        Returns numpy.ndarray of shape (height, width, 3), uint8 RGB
+        """
+        frame = self.plan[k]
+        if self.style == "checked":
+            self._set_checked_state(frame)
+        else:
+            self._set_colored_state(frame)
+        self.line.set_data(frame.x, frame.y)
+
+        self.canvas.draw()
+        return np.array(self.canvas.buffer_rgba())[:, :, :3]
+
+
+# The worker process's renderer, set up once by _init_worker
+_renderer = None
+
+
+def _init_worker(*args):
+    global _renderer
+    _renderer = FrameRenderer(*args)
+
+
+def _render_chunk(frame_numbers):
+    return [_renderer.render(k) for k in frame_numbers]
+
+
+def render_frames_parallel(renderer_args, frame_numbers, workers=None, chunk_size=None):
+    """
+    Render frames on a process pool, yielding the images in frame order.
+
+    Each worker builds one FrameRenderer from renderer_args and draws
+    contiguous chunks of frames. At most two chunks per worker are in
+    flight, so memory stays bounded however long the animation is.
+    workers=1 renders inline.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(16, math.ceil(len(frame_numbers) / (4 * workers))))
+    chunks = [frame_numbers[i:i + chunk_size] for i in range(0, len(frame_numbers), chunk_size)]
+
+    if workers == 1:
+        _init_worker(*renderer_args)
+        for chunk in chunks:
+            yield from _render_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=renderer_args) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_gif(path, images, fps):
+    """Stream RGB frames into an animated GIF with Pillow."""
+    images = (Image.fromarray(image) for image in images)
+    first = next(images, None)
+    if first is None:
+        raise ValueError("No frames to write")
+    first.save(path, save_all=True, append_images=images, duration=round(1000 / fps), loop=0)
+
+
+def write_video(path, images, fps):
+    """
+    Pipe RGB frames into ffmpeg (rcParams['animation.ffmpeg_path']) as raw
+    video; the encoder picks the codec from the file extension.
+    """
+    images = iter(images)
+    first = next(images, None)
+    if first is None:
+        raise ValueError("No frames to write")
+    height, width = first.shape[:2]
+    command = [
+        rcParams["animation.ffmpeg_path"], "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        # H.264 needs even dimensions
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+        path,
+    ]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        process.stdin.write(first.tobytes())
+        for image in images:
+            process.stdin.write(image.tobytes())
+    finally:
+        process.stdin.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {returncode}")
+
+
+WRITERS = {
+    ".gif": write_gif,
+    ".mp4": write_video,
+    ".webm": write_video,
+}
+
+
+def export_animation(points, layers, path, style="checked", fps=EXPORT_FPS, workers=EXPORT_WORKERS,
+                     frame_step=EXPORT_FRAME_STEP, max_frames=EXPORT_MAX_FRAMES, dpi=EXPORT_DPI,
+                     title=None, layer_colors=None):
+    """
+    Render the convex layers animation headlessly to a GIF or video file.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2)
+    layers: Layers as index arrays (e.g. compute_convex_layers(...,
+        output="csr")), or None to peel them here with LAYERS_ENGINE
+    path (str): Output file; the extension picks the writer (see WRITERS)
+    style (str): One of EXPORT_STYLES
+    fps (float): Frames per second of the output
+    workers (int): Render processes, None for every core, 1 for inline
+    frame_step (int): Render every frame_step-th layer
+    max_frames (int): Cap on rendered frames for long onions, or None
+    dpi (int): Output resolution
+    title (str): Axes title, if any
+    layer_colors (list): Per-layer colors for the 'colored' style;
+        golden-ratio hues if None
+
+    Returns the number of frames written
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unknown export format: {extension}")
+    if style not in EXPORT_STYLES:
+        raise ValueError(f"Unknown export style: {style}")
+
+    points = np.asarray(points, dtype=float)
+    if layers is None:
+        layers = cached_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                      dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE, output="csr")
+
+    if style == "checked":
+        highlight_color = CURRENT_HULL_COLOR
+    elif layer_colors is not None:
+        highlight_color = lambda i: layer_colors[i]
+    else:
+        highlight_color = golden_layer_color
+    plan = build_render_plan(points, layers, POINTS_COLOR, highlight_color)
+
+    frame_numbers = select_frames(len(plan), frame_step, max_frames)
+    renderer_args = (points, plan, style, title, dpi, layer_colors)
+    WRITERS[extension](path, render_frames_parallel(renderer_args, frame_numbers, workers), fps)
+    return len(frame_numbers)
+
+
+if __name__ == "__main__":
+    # python export_animation.py [output path] [points]
+    path = sys.argv[1] if len(sys.argv) > 1 else EXPORT_PATH.format(points=NUMBER_POINTS)
+    number_points = int(sys.argv[2]) if len(sys.argv) > 2 else NUMBER_POINTS
+
+    points = generate_points(GEN_MODE, number_points, X_LIM, Y_LIM, POINTS_RANGE,
+                             rng=np.random.default_rng(RANDOM_SEED))
+    start_time = time.perf_counter()
+    layers = cached_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                  dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE, output="csr")
+    layers_time = time.perf_counter() - start_time
+
+    title = f"Convex Layers: {len(points)} points. MODE: {GEN_MODE}, generative seed: {RANDOM_SEED}"
+    start_time = time.perf_counter()
+    frame_count = export_animation(points, layers, path, title=title)
+    export_time = time.perf_counter() - start_time
+
+    print("\n_______________________________________________")
+    print(f"Points volume: {len(points)}")
+    print(f"Layers computed: {len(layers)} in {layers_time:.4f} seconds")
+    print(f"Frames written: {frame_count} to {path}")
+    print(f"Time taken to export: {export_time:.4f} seconds ({frame_count / export_time:.1f} frames/s)")
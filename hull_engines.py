@@ -0,0 +1,427 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import config
+from convexhull_quickhull_implementation import ConvexHull_QuickHull, octagon_prefilter
+from point_dedup import DeduplicatedPoints
+from point_generators import generate_points
+from predicates import orientation, orientation_bound, orientation_sign
+
+# Shape classes of a point set, told apart on a sample (see sample_shape):
+# 'collinear' (the sample hull is a segment), 'grid' (many repeated x or y
+# coordinates, as from generate_grid_points) and 'random' (everything else)
+SHAPES = ("random", "grid", "collinear")
+
+# Registered engines: name -> (hull function, candidate for 'auto')
+HULL_ENGINES = {}
+
+# Bumped whenever the cost features or the calibration file layout change,
+# so an old file is ignored instead of misread
+COST_FORMAT = 1
+
+# _monotone_chain repeats its whole-array pass only while a pass removes at
+# least 1 / _CHAIN_SHRINK of the chain. A pass can remove as few as one
+# point per concave stretch; stopping there keeps the passes at most
+# _CHAIN_SHRINK * n work in total, and the stack pass settles the rest.
+_CHAIN_SHRINK = 8
+
+
+def register_hull_engine(name, hull, auto=True):
+    """
+    Make a hull engine available by name to ConvexHull and the layer path.
+
+    Parameters:
+    name (str): Engine name ('auto' is reserved)
+    hull (callable): hull(points, prefilter=False, stats=None) -> vertex
+        indices, ordered like ConvexHull_QuickHull: clockwise from the
+        lexicographically smallest point, strict hull, the lowest index of
+        a repeated point, a single point when every point shares one x.
+        stats is a hull_stats.HullStats or None; engines without counters
+        leave it alone.
+    auto (bool): Let 'auto' pick the engine. It is only picked once the
+        cost model has coefficients for it (python hull_engines.py
+        calibrate).
+    """
+    if name == "auto":
+        raise ValueError("The engine name 'auto' is reserved")
+    HULL_ENGINES[name] = (hull, auto)
+
+
+class ConvexHull:
+    def __init__(self, points, engine="auto", prefilter=False, stats=None, model=None):
+        """
+        Convex hull of points with any registered engine.
+
+        engine='auto' samples the points (see sample_shape) and runs the
+        engine the cost model expects to be fastest for their size, shape
+        and estimated hull size. Every engine gives the same vertices.
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+        engine (str): A name in HULL_ENGINES, or 'auto'
+        prefilter (bool): Run the octagon prefilter before the engine
+        stats (hull_stats.HullStats): Optional; passed to the engine
+        model (HullCostModel): Cost model of 'auto', default_cost_model()
+            by default
+
+        Attributes:
+        engine (str): The engine that ran ('auto' resolved)
+        """
+        self.points = np.asarray(points)
+        if engine == "auto":
+            shape, hull_size = sample_shape(self.points)
+            model = model if model is not None else default_cost_model()
+            engine = model.choose(len(self.points), hull_size, shape)
+        if engine not in HULL_ENGINES:
+            raise ValueError(f"Unknown hull engine: {engine}")
+        self.engine = engine
+        hull, _ = HULL_ENGINES[engine]
+        self.vertices = hull(self.points, prefilter=prefilter, stats=stats)
+        self._compute_additional_properties()
+
+    def _compute_additional_properties(self):
+        """
+        Simplices and area, as in ConvexHull_QuickHull.
+        """
+        self.simplices = np.column_stack([self.vertices, np.roll(self.vertices, -1)])
+
+        x = self.points[self.vertices, 0]
+        y = self.points[self.vertices, 1]
+        self.area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+
+    def __len__(self):
+        """Return number of vertices in convex hull"""
+        return len(self.vertices)
+
+
+def sample_shape(points, size=None):
+    """
+    Shape class and estimated hull size of points, from a random sample.
+
+    The sample's hull and the hull of its first quarter give the growth
+    h ~ n^a of the hull size (a near 0 for points filling a square, 1 for
+    points on a circle), which is extrapolated to all points. A sample whose
+    x or y coordinates repeat a lot is a 'grid'; a sample hull of one or
+    two points is 'collinear'. Up to size points, the sample is the whole
+    set and the hull size is exact.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2)
+    size (int): Sample size, HULL_AUTO_SAMPLE by default
+
+    Returns (str, float): one of SHAPES and the estimated hull size
+    """
+    points = np.asarray(points, dtype=float)
+    size = size or config.HULL_AUTO_SAMPLE
+    n = len(points)
+    if n <= size:
+        sample = points
+    else:
+        # Fixed seed, so the same input always runs the same engine
+        sample = points[np.random.default_rng(0).choice(n, size, replace=False)]
+    if len(sample) == 0:
+        return "random", 0.0
+
+    hull_size = len(_monotone_chain_hull(sample))
+    if hull_size <= 2:
+        return "collinear", float(hull_size)
+    if len(sample) < n:
+        quarter = max(len(_monotone_chain_hull(sample[:len(sample) // 4])), 1)
+        growth = np.clip(np.log(hull_size / quarter) / np.log(4), 0.0, 1.0)
+        hull_size = hull_size * (n / len(sample)) ** growth
+
+    distinct = min(len(np.unique(sample[:, 0])), len(np.unique(sample[:, 1])))
+    shape = "grid" if distinct < config.HULL_AUTO_GRID_DISTINCT * len(sample) else "random"
+    return shape, float(hull_size)
+
+
+class HullCostModel:
+    def __init__(self, coefficients):
+        """
+        Running-time model of the hull engines, used by 'auto':
+
+            seconds = c0 + c1 * n + c2 * n * log2(n) + c3 * h
+
+        with n points and h hull vertices, one set of non-negative
+        coefficients per engine and shape class. QuickHull's cost grows with
+        h (one recursion call per vertex), a sort-based engine's with
+        n log n, and the prefilter shifts both by shape.
+
+        Parameters:
+        coefficients (dict): engine -> shape -> [c0, c1, c2, c3]
+        """
+        self.coefficients = coefficients
+
+    @classmethod
+    def load(cls, path):
+        """Model saved by save(); None if the file is missing or outdated."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("format") != COST_FORMAT:
+            return None
+        return cls(data["engines"])
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"format": COST_FORMAT, "engines": self.coefficients}, f, indent=2)
+
+    @classmethod
+    def calibrate(cls, engines=None, sizes=None, repeats=3, progress=None):
+        """
+        Fit the model to timed runs of every 'auto' engine: generate_points
+        sets of every shape at HULL_CALIBRATION_SIZES, plus points on a
+        circle (h = n) at the smaller sizes so the per-vertex cost is seen.
+        Each run is the best of repeats.
+
+        Parameters:
+        engines (list): Engine names, by default every registered 'auto' engine
+        sizes (list): Point counts, HULL_CALIBRATION_SIZES by default
+        progress (callable): Optional; called with (engine, shape, n, seconds)
+            after every timing
+
+        Returns HullCostModel
+        """
+        engines = engines or [name for name, (_, auto) in HULL_ENGINES.items() if auto]
+        sizes = sizes or config.HULL_CALIBRATION_SIZES
+        rng = np.random.default_rng(0)
+        sets = {shape: [np.asarray(generate_points(shape, n, rng=rng), dtype=float) for n in sizes]
+                for shape in SHAPES}
+        for n in sizes[:len(sizes) // 2 + 1]:
+            angles = rng.random(n) * 2 * np.pi
+            sets["random"].append(np.column_stack((np.cos(angles), np.sin(angles))) * 500 + 500)
+
+        coefficients = {}
+        for engine in engines:
+            hull, _ = HULL_ENGINES[engine]
+            coefficients[engine] = {}
+            for shape, point_sets in sets.items():
+                features, seconds = [], []
+                for points in point_sets:
+                    best = float("inf")
+                    for _ in range(repeats):
+                        start_time = time.perf_counter()
+                        vertices = hull(points)
+                        best = min(best, time.perf_counter() - start_time)
+                    if progress is not None:
+                        progress(engine, shape, len(points), best)
+                    features.append(_cost_features(len(points), len(vertices)))
+                    seconds.append(best)
+                coefficients[engine][shape] = _fit_costs(np.array(features), np.array(seconds)).tolist()
+        return cls(coefficients)
+
+    def seconds(self, engine, n, hull_size, shape):
+        """Predicted running time, None for an engine without coefficients."""
+        costs = self.coefficients.get(engine, {}).get(shape)
+        if costs is None:
+            return None
+        return float(np.dot(costs, _cost_features(n, hull_size)))
+
+    def choose(self, n, hull_size, shape):
+        """
+        Registered 'auto' engine with the lowest predicted time ('indexed'
+        when none has coefficients).
+        """
+        best, best_seconds = "indexed", None
+        for name, (_, auto) in HULL_ENGINES.items():
+            seconds = self.seconds(name, n, hull_size, shape) if auto else None
+            if seconds is not None and (best_seconds is None or seconds < best_seconds):
+                best, best_seconds = name, seconds
+        return best
+
+
+def _cost_features(n, hull_size):
+    return np.array([1.0, n, n * np.log2(max(n, 2)), hull_size])
+
+
+def _fit_costs(features, seconds):
+    """
+    Non-negative least squares on relative errors: columns whose
+    coefficient comes out negative are dropped and the rest refitted.
+    """
+    weighted = features / seconds[:, None]
+    target = np.ones(len(seconds))
+    active = np.ones(features.shape[1], dtype=bool)
+    while True:
+        costs = np.zeros(features.shape[1])
+        costs[active] = np.linalg.lstsq(weighted[:, active], target, rcond=None)[0]
+        if (costs >= 0).all():
+            return costs
+        active &= costs > 0
+
+
+# Coefficients measured on the development machine, used until
+# 'python hull_engines.py calibrate' writes HULL_ENGINE_COSTS
+DEFAULT_COSTS = {
+    "vectorized": {
+        "random": [0, 0, 7.06e-08, 0.000101],
+        "grid": [3.22e-05, 0, 5.42e-09, 0.000129],
+        "collinear": [6.53e-05, 0, 1.04e-08, 0.000131],
+    },
+    "indexed": {
+        "random": [0, 0, 1.21e-08, 7e-05],
+        "grid": [5.9e-05, 0, 8.72e-09, 0.000236],
+        "collinear": [3.38e-05, 0, 9.42e-09, 6.77e-05],
+    },
+    "octagon": {
+        "random": [0, 0, 6.01e-09, 5.67e-05],
+        "grid": [2.99e-05, 0, 1.75e-09, 0.000119],
+        "collinear": [2.82e-05, 0, 5.39e-09, 5.64e-05],
+    },
+    "monotone_chain": {
+        "random": [0.000235, 0, 6.27e-08, 0],
+        "grid": [1.59e-05, 0, 1.83e-08, 6.36e-05],
+        "collinear": [2.78e-05, 0, 1.6e-08, 5.55e-05],
+    },
+}
+
+# Loaded on first use by default_cost_model
+_default_model = None
+
+
+def default_cost_model():
+    """
+    The calibrated model in HULL_ENGINE_COSTS if there is one, otherwise
+    DEFAULT_COSTS. Loaded once.
+    """
+    global _default_model
+    if _default_model is None:
+        _default_model = HullCostModel.load(config.HULL_ENGINE_COSTS) or HullCostModel(DEFAULT_COSTS)
+    return _default_model
+
+
+def _quickhull_engine(engine, prefilter_always=False):
+    """A ConvexHull_QuickHull engine as a registry hull function."""
+    def hull(points, prefilter=False, stats=None):
+        return ConvexHull_QuickHull(points, engine=engine, stats=stats,
+                                    prefilter=prefilter or prefilter_always).vertices
+    return hull
+
+
+def _monotone_chain_hull(points, prefilter=False, stats=None):
+    """
+    Monotone chain engine: one lexsort (with the copies of a point merged,
+    see DeduplicatedPoints) and a monotone chain pass. O(n log n) whatever
+    the hull size, so it wins where QuickHull's per-vertex cost dominates.
+    """
+    points = np.asarray(points, dtype=float)
+    rows = None
+    if prefilter:
+        rows = octagon_prefilter(points)
+        points = points[rows]
+    distinct = DeduplicatedPoints(points)
+    xs = distinct.points[:, 0]
+    ys = distinct.points[:, 1]
+    if len(xs) == 0 or xs[0] == xs[-1]:
+        # Every point shares one x coordinate; like ConvexHull_QuickHull,
+        # the hull collapses to the lowest one
+        vertices = distinct.first[:1]
+    else:
+        vertices = distinct.first[_sorted_hull(xs, ys)]
+    return vertices if rows is None else rows[vertices]
+
+
+def _monotone_chain(xs, ys, chain, upper=True, bound=None):
+    """
+    Andrew's monotone chain over sorted positions, keeping strict turns only
+    (clockwise for the upper chain, counter-clockwise for the lower one).
+
+    Points that turn the wrong way, or sit strictly inside a collinear run,
+    are first dropped in whole-array passes, for as long as each pass
+    shrinks the chain by a fixed fraction (see _CHAIN_SHRINK); removing
+    them is always safe because each lies beyond or on the segment joining
+    its neighbours. On typical inputs that leaves little more than the hull
+    for the stack pass, which finishes the chain in linear time whatever
+    the passes left. Of repeated points the first in chain order (the
+    lowest index, as lexsort is stable) is kept.
+
+    Turns are decided by the exact orientation predicate; bound is the
+    orientation_bound() of the points (computed here if not given).
+
+    Returns array of sorted positions, left to right
+    """
+    sign = 1 if upper else -1
+    if bound is None:
+        bound = orientation_bound(np.column_stack((xs[chain], ys[chain])))
+    while len(chain) > 2:
+        x = xs[chain]
+        y = ys[chain]
+        turn = sign * orientation(x[:-2], y[:-2], x[1:-1], y[1:-1], x[2:], y[2:], bound=bound)
+        # In sorted order a collinear point lies between its neighbours,
+        # unless it repeats one of them
+        repeated = (((x[1:-1] == x[:-2]) & (y[1:-1] == y[:-2])) |
+                    ((x[1:-1] == x[2:]) & (y[1:-1] == y[2:])))
+        wrong_way = (turn > 0) | ((turn == 0) & ~repeated)
+        if not wrong_way.any():
+            break
+        keep = np.ones(len(chain), dtype=bool)
+        keep[1:-1] = ~wrong_way
+        removed = len(chain) - 2 - int(keep[1:-1].sum())
+        chain = chain[keep]
+        if removed * _CHAIN_SHRINK < len(keep):
+            break
+
+    x = xs[chain].tolist()
+    y = ys[chain].tolist()
+    hull = []
+    for k in range(len(chain)):
+        if hull and x[hull[-1]] == x[k] and y[hull[-1]] == y[k]:
+            # Copies are next to each other in sorted order (by index among
+            # themselves); the first one, just pushed, stands for them all
+            continue
+        while len(hull) >= 2:
+            o, a = hull[-2], hull[-1]
+            turn = (x[a] - x[o]) * (y[k] - y[o]) - (y[a] - y[o]) * (x[k] - x[o])
+            if abs(turn) <= bound:
+                turn = orientation_sign(x[o], y[o], x[a], y[a], x[k], y[k])
+            if sign * turn >= 0:
+                hull.pop()
+            else:
+                break
+        hull.append(k)
+    return chain[hull]
+
+
+def _sorted_hull(xs, ys):
+    """
+    Strict hull of distinct points given in (x, y) order, as positions
+    clockwise from the leftmost point (the order of every layer engine).
+    """
+    chain = np.arange(len(xs))
+    upper = _monotone_chain(xs, ys, chain, upper=True)
+    lower = _monotone_chain(xs, ys, chain, upper=False)
+    return np.concatenate((upper, lower[-2:0:-1]))
+
+
+register_hull_engine("reference", _quickhull_engine("reference"), auto=False)
+register_hull_engine("vectorized", _quickhull_engine("vectorized"))
+register_hull_engine("indexed", _quickhull_engine("indexed"))
+register_hull_engine("octagon", _quickhull_engine("indexed", prefilter_always=True))
+register_hull_engine("monotone_chain", _monotone_chain_hull)
+
+
+if __name__ == "__main__":
+    # python hull_engines.py calibrate   (once per machine, after installing)
+    # python hull_engines.py [points] [mode]
+    if sys.argv[1:2] == ["calibrate"]:
+        def report(engine, shape, n, seconds):
+            print(f"{engine:>16} {shape:>10} {n:>8} points  {seconds * 1000:9.3f} ms", flush=True)
+
+        model = HullCostModel.calibrate(progress=report)
+        model.save(config.HULL_ENGINE_COSTS)
+        print(f"Cost model written to {config.HULL_ENGINE_COSTS}")
+    else:
+        count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+        mode = sys.argv[2] if len(sys.argv) > 2 else config.GEN_MODE
+        points = np.asarray(generate_points(mode, count), dtype=float)
+        shape, hull_size = sample_shape(points)
+        print(f"Sampled shape: {shape}, estimated hull size: {hull_size:.0f}")
+        for engine in ["auto"] + [name for name, (_, auto) in HULL_ENGINES.items() if auto]:
+            start_time = time.perf_counter()
+            hull = ConvexHull(points, engine=engine)
+            print(f"{engine:>16} -> {hull.engine:<16} {len(hull):>6} vertices  "
+                  f"{(time.perf_counter() - start_time) * 1000:9.3f} ms")
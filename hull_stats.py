@@ -0,0 +1,125 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class HullStats:
+    """
+    Counters and phase timers for one ConvexHull_QuickHull run.
+
+    Pass an instance as ConvexHull_QuickHull(points, stats=HullStats()); the
+    hull fills it in. Without one no counting or timing code runs.
+
+    Attributes:
+        recursion_calls (int): Non-empty calls of the hull recursion.
+        max_depth (int): Deepest recursion level reached (1 = first split).
+        orientation_tests (int): Line-side evaluations, initial split included.
+        partition_sizes (list): Candidate count of every recursion call.
+        phase_seconds (dict): perf_counter seconds per phase ('split',
+            'recursion', 'index_recovery', 'properties').
+    """
+
+    def __init__(self):
+        self.recursion_calls = 0
+        self.max_depth = 0
+        self.orientation_tests = 0
+        self.partition_sizes = []
+        self.phase_seconds = {}
+        # The threaded indexed engine records from several threads
+        self._lock = threading.Lock()
+
+    def record_call(self, depth, candidates, orientation_tests):
+        """Count one recursion call over `candidates` points."""
+        with self._lock:
+            self.recursion_calls += 1
+            self.max_depth = max(self.max_depth, depth)
+            self.orientation_tests += orientation_tests
+            self.partition_sizes.append(candidates)
+
+    def count_tests(self, orientation_tests):
+        """Count line-side evaluations made outside the recursion."""
+        with self._lock:
+            self.orientation_tests += orientation_tests
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the with-block to phase_seconds[name]."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+
+    def as_dict(self):
+        """Plain-dict snapshot, e.g. for json.dump."""
+        return {
+            "recursion_calls": self.recursion_calls,
+            "max_depth": self.max_depth,
+            "orientation_tests": self.orientation_tests,
+            "partition_sizes": list(self.partition_sizes),
+            "phase_seconds": dict(self.phase_seconds),
+        }
+
+
+class LayerStats:
+    """
+    Per-layer record of one compute_convex_layers run.
+
+    Pass an instance as compute_convex_layers(points, stats=LayerStats());
+    every finished layer is appended to `layers` and, if given, handed to
+    `callback` right away, so long peelings can be watched while they run.
+
+    Each layer record is a dict with:
+        layer (int): Layer number, outermost = 0.
+        points (int): Points still alive when the layer was peeled.
+        vertices (int): Points on the layer.
+        seconds (float): perf_counter time spent on the layer.
+        hull (HullStats or None): The layer's hull counters ('quickhull'
+            engine only).
+        engine (str or None): Hull engine that computed the layer
+            ('quickhull' engine only; what 'auto' picked).
+
+    phase_seconds holds engine set-up phases that are not tied to one
+    layer ('sort' for 'presorted', 'build' for 'hull_tree').
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.layers = []
+        self.phase_seconds = {}
+
+    def add_layer(self, points, vertices, seconds, hull=None, engine=None):
+        record = {
+            "layer": len(self.layers),
+            "points": points,
+            "vertices": vertices,
+            "seconds": seconds,
+            "hull": hull,
+            "engine": engine,
+        }
+        self.layers.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the with-block to phase_seconds[name]."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + time.perf_counter() - start_time
+
+    @property
+    def total_seconds(self):
+        return sum(self.phase_seconds.values()) + sum(layer["seconds"] for layer in self.layers)
+
+    def as_dict(self):
+        """Plain-dict snapshot, e.g. for json.dump."""
+        return {
+            "phase_seconds": dict(self.phase_seconds),
+            "layers": [dict(layer, hull=None if layer["hull"] is None else layer["hull"].as_dict())
+                       for layer in self.layers],
+        }
@@ -0,0 +1,220 @@
+import numpy as np
+from convex_layers import ConvexLayersCSR, compute_convex_layers
+from hull_engines import _sorted_hull
+from predicates import orientation
+
+
+class IncrementalConvexLayers:
+    def __init__(self, points, layers):
+        """
+        Convex layers kept up to date under single point insertions and
+        deletions, repairing only the layers a change disturbs.
+
+        Depths only grow when a point is added and only shrink when one is
+        removed, and each layer's new hull can be built from its old
+        vertices plus the few points moving across it:
+        - inserting p at depth k leaves layers 0 to k - 1 alone; layer j
+          becomes the hull of its old vertices and the points carried down
+          from layer j - 1, and whatever that hull leaves out is carried on.
+        - deleting q from layer k makes layer j the hull of its remaining
+          vertices and layer j + 1; the points it pulls up are what layer
+          j + 1 loses.
+        Either walk stops at the first layer nothing crosses, so an update
+        costs a few small hulls around the disturbed region.
+
+        Repeated coordinates share one layer, as with
+        compute_convex_layers(..., dedup=True).
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2); they
+            become ids 0 to n - 1
+        layers: Index layers of points, outermost first (a ConvexLayersCSR
+            or a list of index arrays), computed with dedup=True and
+            permit_1_or_2_remaining=True (see from_points)
+        """
+        points = np.asarray(points, dtype=float)
+        self._xs = points[:, 0].tolist()
+        self._ys = points[:, 1].tolist()
+        # Ids of every alive copy of a coordinate pair
+        self._copies = {}
+        # Layer number of every coordinate pair, and the layers as lists of
+        # coordinate pairs in hull order
+        self._depth = {}
+        self._layers = []
+        self._arrays = []
+
+        for d, layer in enumerate(layers):
+            keys = []
+            for i in np.asarray(layer).tolist():
+                key = self._key(i)
+                if key in self._depth and self._depth[key] != d:
+                    raise ValueError("Repeated coordinates must share one layer (use dedup=True)")
+                if key not in self._depth:
+                    self._depth[key] = d
+                    keys.append(key)
+                self._copies.setdefault(key, []).append(i)
+            self._layers.append(keys)
+            self._arrays.append(None)
+        if sum(len(copies) for copies in self._copies.values()) != len(points):
+            raise ValueError("Every point must be in a layer (use permit_1_or_2_remaining=True)")
+        self._count = len(points)
+
+    @classmethod
+    def from_points(cls, points, engine="quickhull", **kwargs):
+        """Peel points with compute_convex_layers and keep the layers up to date."""
+        points = np.asarray(points)
+        layers = compute_convex_layers(points, engine=engine, output="csr", dedup=True, **kwargs)
+        return cls(points, layers)
+
+    def _key(self, i):
+        return (self._xs[i], self._ys[i])
+
+    def _set_layer(self, d, keys):
+        """Replace layer d (appending it if d is one past the last layer)."""
+        if d == len(self._layers):
+            self._layers.append(keys)
+            self._arrays.append(None)
+        else:
+            self._layers[d] = keys
+            self._arrays[d] = None
+        for key in keys:
+            self._depth[key] = d
+
+    def _strictly_inside(self, d, key):
+        """Whether key lies strictly inside the hull of layer d."""
+        if len(self._layers[d]) < 3:
+            return False
+        if self._arrays[d] is None:
+            self._arrays[d] = np.array(self._layers[d])
+        start = self._arrays[d]
+        end = np.roll(start, -1, axis=0)
+        # Layers run clockwise, so the inside is right of every edge
+        turn = orientation(start[:, 0], start[:, 1], end[:, 0], end[:, 1], key[0], key[1])
+        return bool((turn < 0).all())
+
+    def locate(self, point):
+        """
+        Layer a new point would join: the first layer whose hull does not
+        strictly contain it. Binary search, since the hulls are nested.
+
+        Returns int (len(self) for a point inside the innermost layer)
+        """
+        key = (float(point[0]), float(point[1]))
+        if key in self._depth:
+            return self._depth[key]
+        lo, hi = 0, len(self._layers)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._strictly_inside(mid, key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def insert(self, point):
+        """
+        Add a point.
+
+        Returns (int, list): the new point's id and the numbers of the
+        layers that changed
+        """
+        i = len(self._xs)
+        x, y = float(point[0]), float(point[1])
+        self._xs.append(x)
+        self._ys.append(y)
+        self._count += 1
+
+        key = (x, y)
+        if key in self._copies:
+            # Joins its coordinates' layer; no hull changes
+            self._copies[key].append(i)
+            return i, [self._depth[key]]
+        self._copies[key] = [i]
+
+        d = self.locate(key)
+        changed = []
+        carried = [key]
+        while carried:
+            candidates = (self._layers[d] if d < len(self._layers) else []) + carried
+            layer = _hull_keys(candidates)
+            kept = set(layer)
+            carried = [c for c in candidates if c not in kept]
+            self._set_layer(d, layer)
+            changed.append(d)
+            d += 1
+        return i, changed
+
+    def delete(self, i):
+        """
+        Remove the point with id i.
+
+        Returns list: the numbers of the layers that changed
+        """
+        key = self._key(i)
+        copies = self._copies.get(key)
+        if copies is None or i not in copies:
+            raise KeyError(f"Unknown point id: {i}")
+        copies.remove(i)
+        self._count -= 1
+        d = self._depth[key]
+        if copies:
+            return [d]
+
+        del self._copies[key]
+        del self._depth[key]
+        changed = []
+        lost = {key}
+        while lost:
+            rest = [c for c in self._layers[d] if c not in lost]
+            below = self._layers[d + 1] if d + 1 < len(self._layers) else []
+            layer = _hull_keys(rest + below)
+            lost = set(layer).difference(rest)
+            self._set_layer(d, layer)
+            changed.append(d)
+            d += 1
+        while self._layers and not self._layers[-1]:
+            self._layers.pop()
+            self._arrays.pop()
+        return changed
+
+    def depth(self, i):
+        """Layer of the point with id i."""
+        key = self._key(i)
+        if i not in self._copies.get(key, ()):
+            raise KeyError(f"Unknown point id: {i}")
+        return self._depth[key]
+
+    def layer(self, d):
+        """Ids of layer d in hull order, copies of a point next to each other."""
+        return np.array([i for key in self._layers[d] for i in self._copies[key]], dtype=np.intp)
+
+    def to_csr(self):
+        """
+        The current layers as a ConvexLayersCSR over all ids (deleted ids
+        have depth -1), like compute_convex_layers(..., output='csr').
+        """
+        return ConvexLayersCSR([self.layer(d) for d in range(len(self))], len(self._xs))
+
+    @property
+    def points(self):
+        """Coordinates of every id ever used; rows of deleted points stay."""
+        return np.column_stack((self._xs, self._ys))
+
+    @property
+    def count(self):
+        """Number of alive points (copies included)."""
+        return self._count
+
+    def __len__(self):
+        """Return number of layers"""
+        return len(self._layers)
+
+
+def _hull_keys(keys):
+    """Hull vertices of distinct coordinate pairs, in layer order."""
+    if not keys:
+        return []
+    keys = sorted(keys)
+    xs = np.array([key[0] for key in keys])
+    ys = np.array([key[1] for key in keys])
+    return [keys[r] for r in _sorted_hull(xs, ys).tolist()]
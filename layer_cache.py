@@ -0,0 +1,189 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import config
+from convex_layers import LAYER_ENGINES, LAYER_OUTPUTS, ConvexLayersCSR, compute_convex_layers
+
+# Bumped whenever the stored arrays or the peeling results change, so old
+# entries stop matching instead of being loaded
+CACHE_FORMAT = 3
+
+
+class LayerCache:
+    def __init__(self, directory=None, max_bytes=None):
+        """
+        On-disk cache of convex layers, content-addressed by the input points.
+
+        An entry's key is a hash of the point array (dtype, shape and bytes)
+        and every argument that changes the peeling. Entries are compressed
+        .npz files of the ConvexLayersCSR arrays, so one entry serves both
+        output formats. When the directory grows past max_bytes, the least
+        recently used entries (oldest modification time; a hit touches its
+        file) are deleted.
+
+        Parameters:
+        directory (str): Cache directory, LAYER_CACHE_DIR by default
+        max_bytes (int): Size bound of the directory, LAYER_CACHE_MAX_BYTES
+            by default
+
+        Attributes:
+        hits, misses, evictions (int): Counters since this cache was created
+        """
+        self.directory = directory if directory is not None else config.LAYER_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else config.LAYER_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, points, engine="quickhull", hull_engine="indexed",
+            permit_1_or_2_remaining=True, prefilter=False, dedup=False):
+        """Hex digest identifying one peeling of `points`."""
+        points = np.ascontiguousarray(points)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr((CACHE_FORMAT, points.dtype.str, points.shape, engine, hull_engine,
+                            bool(permit_1_or_2_remaining), bool(prefilter), bool(dedup))).encode())
+        digest.update(points.data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        """
+        Cached layers for key, counting a hit or a miss.
+
+        Returns ConvexLayersCSR, or None on a miss (unreadable entries are
+        deleted and count as misses)
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                layers = ConvexLayersCSR.from_arrays(data["indices"], data["offsets"], data["depth"])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError):
+            # Truncated or foreign file
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        os.utime(path)
+        self.hits += 1
+        return layers
+
+    def store(self, key, layers):
+        """Write layers (a ConvexLayersCSR) under key, then evict down to max_bytes."""
+        # Written next to the entry and renamed, so readers never see half a file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, indices=layers.indices, offsets=layers.offsets, depth=layers.depth)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """(path, size, mtime) of every entry, least recently used first."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".npz"):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        entries.sort(key=lambda entry: entry[2])
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Delete every entry."""
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def compute_convex_layers(self, points, engine="quickhull", hull_engine="indexed",
+                              permit_1_or_2_remaining=True, stats=None, prefilter=False,
+                              output="coordinates", dedup=False):
+        """
+        convex_layers.compute_convex_layers, served from the cache when the
+        same points were peeled with the same arguments before.
+
+        A run with `stats` always computes, since the counters describe an
+        actual peeling; its result is still stored.
+        """
+        if engine not in LAYER_ENGINES:
+            raise ValueError(f"Unknown layer engine: {engine}")
+        if output not in LAYER_OUTPUTS:
+            raise ValueError(f"Unknown layer output: {output}")
+
+        points = np.asarray(points)
+        key = self.key(points, engine, hull_engine, permit_1_or_2_remaining, prefilter, dedup)
+
+        layers = self.load(key) if stats is None else None
+        if layers is None:
+            layers = compute_convex_layers(points, engine=engine, hull_engine=hull_engine,
+                                           permit_1_or_2_remaining=permit_1_or_2_remaining,
+                                           stats=stats, prefilter=prefilter, output="csr", dedup=dedup)
+            self.store(key, layers)
+
+        if output == "csr":
+            return layers
+        return [points[layer] for layer in layers]
+
+    def as_dict(self):
+        """Counters and current size, e.g. for json.dump."""
+        entries = self.entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def summary(self):
+        stats = self.as_dict()
+        return (f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+                f"{stats['entries']} entries / {stats['bytes'] / 1024:.2f} KB")
+
+
+_default_cache = None
+
+
+def default_cache():
+    """The LayerCache of LAYER_CACHE_DIR, created on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LayerCache()
+    return _default_cache
+
+
+def cached_convex_layers(points, **kwargs):
+    """
+    compute_convex_layers through default_cache() when LAYER_CACHE is on
+    (read at call time, so the GUI can toggle it), directly otherwise.
+    """
+    if config.LAYER_CACHE:
+        return default_cache().compute_convex_layers(points, **kwargs)
+    return compute_convex_layers(points, **kwargs)
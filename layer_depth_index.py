@@ -0,0 +1,139 @@
+import numpy as np
+from predicates import orientation, orientation_bound
+
+
+class LayerDepthIndex:
+    def __init__(self, layers, points=None):
+        """
+        Convex depth queries against computed convex layers: for every
+        query point, the deepest layer whose hull contains it.
+
+        Every layer is stored as a counter-clockwise polygon starting at its
+        leftmost vertex, all of them in one flat array with offsets. A point
+        is inside a polygon if it lies in the fan wedge v0, v_i, v_i+1 found
+        by binary search over the vertex angles around v0. The hulls are
+        nested, so the depth is a second binary search over the layers:
+        O(log L * log h) orientation tests per query, each step one
+        vectorized pass over all queries still searching. One- and
+        two-point layers are a point or a segment, and the search relies on
+        every layer lying inside the one before it (boundary included), so
+        that is checked once here.
+
+        Parameters:
+        layers: compute_convex_layers output, outermost first; either the
+            (k, 2) coordinate arrays, or index layers (a ConvexLayersCSR or
+            index arrays) together with points
+        points (numpy.ndarray): Array of points with shape (n, 2), for
+            index layers
+
+        Raises ValueError if a layer is not inside the previous one
+        """
+        polygons = []
+        for layer in layers:
+            layer = np.asarray(layer)
+            if layer.ndim == 1:
+                if points is None:
+                    raise ValueError("Index layers need the points")
+                layer = np.asarray(points)[layer]
+            layer = np.asarray(layer, dtype=float).reshape(-1, 2)
+            # Copies of a point (dedup=True output) would be zero-length edges
+            repeated = np.zeros(len(layer), dtype=bool)
+            repeated[1:] = (layer[1:] == layer[:-1]).all(axis=1)
+            layer = layer[~repeated]
+            # Layers run clockwise from the leftmost point
+            polygons.append(np.concatenate((layer[:1], layer[:0:-1])))
+
+        self.sizes = np.array([len(polygon) for polygon in polygons], dtype=np.intp)
+        self.offsets = np.zeros(len(polygons) + 1, dtype=np.intp)
+        np.cumsum(self.sizes, out=self.offsets[1:])
+        vertices = np.concatenate(polygons) if polygons else np.empty((0, 2))
+        self.x = np.ascontiguousarray(vertices[:, 0])
+        self.y = np.ascontiguousarray(vertices[:, 1])
+        self._check_nested()
+
+    def _check_nested(self):
+        """
+        Every vertex of layer i + 1 must lie in the hull of layer i, or the
+        depth search would skip layers.
+        """
+        if len(self) < 2:
+            return
+        outer = np.repeat(np.arange(len(self) - 1), self.sizes[1:])
+        qx = self.x[self.offsets[1]:]
+        qy = self.y[self.offsets[1]:]
+        corners = np.column_stack(([self.x.min(), self.x.max()], [self.y.min(), self.y.max()]))
+        inside = self._inside(outer, qx, qy, orientation_bound(corners))
+        if not inside.all():
+            layer = int(outer[np.argmin(inside)]) + 1
+            raise ValueError(f"Layer {layer} is not inside layer {layer - 1}; layers must be nested")
+
+    def depth(self, queries):
+        """
+        Convex depth of every query point: the deepest layer whose hull
+        (boundary included) contains it, -1 outside the outermost hull. For
+        the points the layers were computed from, this is their layer
+        (copies of a point peeled with dedup=False all get the deepest one).
+
+        Parameters:
+        queries (numpy.ndarray): Query points, shape (m, 2)
+
+        Returns numpy.ndarray of shape (m,), int
+        """
+        queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+        qx = queries[:, 0]
+        qy = queries[:, 1]
+        # One error bound for every test: the box around vertices and queries
+        corners = np.array([[self.x.min(initial=np.inf), self.y.min(initial=np.inf)],
+                            [self.x.max(initial=-np.inf), self.y.max(initial=-np.inf)],
+                            [qx.min(initial=np.inf), qy.min(initial=np.inf)],
+                            [qx.max(initial=-np.inf), qy.max(initial=-np.inf)]])
+        bound = orientation_bound(corners[np.isfinite(corners).all(axis=1)])
+        lo = np.full(len(queries), -1, dtype=np.intp)
+        hi = np.full(len(queries), len(self) - 1, dtype=np.intp)
+        # Largest layer whose hull contains the query
+        active = np.flatnonzero(lo < hi)
+        while len(active):
+            mid = (lo[active] + hi[active] + 1) // 2
+            inside = self._inside(mid, qx[active], qy[active], bound)
+            lo[active[inside]] = mid[inside]
+            hi[active[~inside]] = mid[~inside] - 1
+            active = active[lo[active] < hi[active]]
+        return lo
+
+    def _inside(self, layer, qx, qy, bound):
+        """Whether each query lies in the hull of its layer (closed)."""
+        x, y = self.x, self.y
+        base = self.offsets[layer]
+        h = self.sizes[layer]
+        x0, y0 = x[base], y[base]
+        last = base + h - 1
+        first = base + np.minimum(h - 1, 1)
+        after_first = orientation(x0, y0, x[first], y[first], qx, qy, bound=bound)
+        before_last = orientation(x0, y0, x[last], y[last], qx, qy, bound=bound)
+
+        # Wedge: the largest i in [1, h - 2] with the query left of (or on)
+        # v0 -> v_i; the angles around v0 increase with i. Whole-array steps,
+        # as many as the largest polygon needs.
+        lo = np.ones(len(layer), dtype=np.intp)
+        hi = np.maximum(h - 2, 1)
+        for _ in range(int(hi.max(initial=1) - 1).bit_length()):
+            mid = (lo + hi + 1) >> 1
+            # Point and segment layers take the segment test below
+            k = base + np.minimum(mid, h - 1)
+            left = orientation(x0, y0, x[k], y[k], qx, qy, bound=bound) >= 0
+            lo = np.where(left, mid, lo)
+            hi = np.where(left, hi, mid - 1)
+
+        start = base + np.minimum(lo, h - 1)
+        end = base + np.minimum(lo + 1, h - 1)
+        edge = orientation(x[start], y[start], x[end], y[end], qx, qy, bound=bound)
+        polygon = (after_first >= 0) & (before_last <= 0) & (edge >= 0)
+
+        # One or two points: on the segment between v0 and the last vertex
+        between = (((qx - x0) * (x[last] - qx) >= 0) & ((qy - y0) * (y[last] - qy) >= 0))
+        segment = (after_first == 0) & between
+        return np.where(h >= 3, polygon, segment)
+
+    def __len__(self):
+        """Return number of layers"""
+        return len(self.sizes)
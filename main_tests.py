@@ -3,85 +3,139 @@ import time
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import tracemalloc
-from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+from concurrent.futures import ProcessPoolExecutor
+from convex_layers import compute_convex_layers, iter_convex_layers
+from layer_cache import cached_convex_layers, default_cache
+from render_plan import HullArtists, build_render_plan, render_frames
+from export_animation import export_animation
+from point_generators import generate_points
 from config import *
 
 # For reproducibility
 if not PERMIT_RANDOM_SEED:
     np.random.seed(RANDOM_SEED)  
 
-def generate_grid_points(grid_size, x_range, y_range):
+def make_sweep_jobs(sizes, gen_modes, seeds_per_job, base_seed=RANDOM_SEED):
     """
-    Generate points in a grid format based on the specified grid size and ranges.
-    """
-    x_values = np.linspace(0, x_range, grid_size)
-    y_values = np.linspace(0, y_range, grid_size)
-    
-    x_grid, y_grid = np.meshgrid(x_values, y_values)
-    points = np.vstack([x_grid.ravel(), y_grid.ravel()]).T
-    return points
-
-def compute_convex_layers(points):
+    Build the (size, mode, seed) job list of a sweep, in serial-run order.
+
+    Every job gets its own child of one SeedSequence, so its random stream
+    depends only on its position in the list, not on which worker runs it.
     """
-    Compute convex layers using the QuickHull algorithm.
+    jobs = [(size, gen_mode, run)
+            for gen_mode in gen_modes
+            for size in sizes
+            for run in range(seeds_per_job)]
+    children = np.random.SeedSequence(base_seed).spawn(len(jobs))
+    return [(size, gen_mode, seed) for (size, gen_mode, _), seed in zip(jobs, children)]
+
+def run_sweep_job(job):
     """
-    layers = []
-    remaining_points = points.copy()
-    
-    while len(remaining_points) > 0:
-        if len(remaining_points) >= 3:
-            hull = ConvexHull(remaining_points)
-            layers.append(remaining_points[hull.vertices])
-            remaining_points = np.delete(remaining_points, hull.vertices, axis=0)
-        else:
-            if len(remaining_points) == 2:
-                layers.append(remaining_points)
-            elif len(remaining_points) == 1:
-                layers.append(remaining_points)
-            remaining_points = np.array([])  # Clear remaining points
-            
-    return layers
+    Generate one point set and peel it, measuring time and peak memory.
 
-def generate_collinear_points(n, x_range=1000):
+    Runs in a worker process, so it only returns plain numbers.
     """
-    Generate n collinear points along the x-axis (y = 0).
+    size, gen_mode, seed = job
+    rng = np.random.default_rng(seed)
+    points = generate_points(gen_mode, size, X_LIM, Y_LIM, POINTS_RANGE, rng=rng)
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    convex_layers = compute_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                          dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE)
+    end_time = time.perf_counter()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "size": size,
+        "mode": gen_mode,
+        "seed": f"{seed.entropy}-{seed.spawn_key[-1]}",
+        "points": len(points),
+        "seconds": end_time - start_time,
+        "peak_kb": peak / 1024,
+        "layers": len(convex_layers),
+    }
+
+def run_sweep(jobs, workers=None):
     """
-    x = np.linspace(0, x_range, n)
-    y = np.linspace(500, 500, n)
-    return np.vstack([x, y]).T
+    Run sweep jobs on a process pool (or inline for workers=1).
+
+    Results come back in job order, exactly as a serial run would print them.
+    """
+    if workers == 1:
+        return [run_sweep_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_sweep_job, jobs))
 
 # Memory and time tracking
-if __name__ == "__main__":
+if __name__ == "__main__" and PARALLEL_SWEEP:
+    jobs = make_sweep_jobs(POINTS_LIST, SWEEP_GEN_MODES, SWEEP_SEEDS_PER_SIZE)
+
+    start_time = time.perf_counter()
+    results = run_sweep(jobs, SWEEP_WORKERS)
+    end_time = time.perf_counter()
+
+    for result in results:
+        print("\n_______________________________________________")
+        print(f"MODE: {result['mode']}, seed: {result['seed']}")
+        print(f"Points volume: {result['points']}")
+        print(f"Peak Memory Usage: {result['peak_kb']:.2f} KB")
+        print(f"Time taken to compute convex layers: {result['seconds']:.4f} seconds")
+        print(f"Layers computed: {result['layers']}")
+    print(f"\nSweep of {len(jobs)} jobs took {end_time - start_time:.4f} seconds wall-clock")
+
+elif __name__ == "__main__":
     for points_in_list in POINTS_LIST:
 
-        # Start memory tracking
-        tracemalloc.start()
+        if LAZY_LAYERS:
+            # Layers are peeled while the animation plays, so nothing is
+            # measured up front
+            points = np.random.rand(points_in_list, 2) * POINTS_RANGE
 
-        # Generate points
-        points = np.random.rand(points_in_list, 2) * POINTS_RANGE
+            def frames(points=points):
+                layers = iter_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                            dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE, indices=True)
+                return render_frames(points, layers, POINTS_COLOR, CURRENT_HULL_COLOR)
+        else:
+            # Start memory tracking
+            tracemalloc.start()
 
-        # Snapshot memory usage before convex layer computation
-        snapshot_before = tracemalloc.take_snapshot()
+            # Generate points
+            points = np.random.rand(points_in_list, 2) * POINTS_RANGE
 
-        # Measure computation time
-        start_time = time.time()
-        convex_layers = compute_convex_layers(points)
-        end_time = time.time()
+            # Snapshot memory usage before convex layer computation
+            snapshot_before = tracemalloc.take_snapshot()
 
-        # Snapshot memory usage after convex layer computation
-        snapshot_after = tracemalloc.take_snapshot()
+            # Measure computation time
+            start_time = time.time()
+            convex_layers = cached_convex_layers(points, engine=LAYERS_ENGINE, prefilter=LAYERS_PREFILTER,
+                                                 dedup=LAYERS_DEDUP, hull_engine=LAYERS_HULL_ENGINE,
+                                                 output="csr")
+            end_time = time.time()
 
-        # Take a snapshot of current memory usage
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+            # Snapshot memory usage after convex layer computation
+            snapshot_after = tracemalloc.take_snapshot()
 
-        # Print peak memory usage and time
-        print("\n_______________________________________________")
-        print("Random generated points on a tested seed")
-        print(f"Points volume: {points_in_list}")
-        print(f"Peak Memory Usage: {peak / 1024:.2f} KB")
-        print(f"Time taken to compute convex layers: {end_time - start_time:.4f} seconds")
-        print(f"Layers computed: {len(convex_layers)}")
+            # Take a snapshot of current memory usage
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # Print peak memory usage and time
+            print("\n_______________________________________________")
+            print("Random generated points on a tested seed")
+            print(f"Points volume: {points_in_list}")
+            print(f"Peak Memory Usage: {peak / 1024:.2f} KB")
+            print(f"Time taken to compute convex layers: {end_time - start_time:.4f} seconds")
+            print(f"Layers computed: {len(convex_layers)}")
+            if LAYER_CACHE:
+                print(f"Layer cache: {default_cache().summary()}")
+
+            # Everything animate() needs, worked out before the first frame
+            render_plan = build_render_plan(points, convex_layers, POINTS_COLOR, CURRENT_HULL_COLOR)
+
+            def frames(render_plan=render_plan):
+                return iter(render_plan)
 
         if LET_ANIMATION:
         
@@ -100,72 +154,38 @@ if __name__ == "__main__":
             line, = ax.plot([], [], 'r-', lw=LINE_SIZE, label='Current Convex Hull')
 
             alphas = np.ones(len(points))
-            previous_hulls = []
-            verified_hulls = []
+            # Checked and last-layer hulls, in a fixed number of artists
+            hulls = HullArtists(ax, CHECKED_HULL_COLOR, CURRENT_HULL_COLOR)
 
             def init():
                 line.set_data([], [])
                 scat.set_alpha(alphas)
-                return [scat, line] + previous_hulls + verified_hulls
+                return [scat, line] + hulls.artists
             
-            def animate(i):
-                global alphas, previous_hulls, verified_hulls
+            def animate(frame):
+                global alphas
                 
-                if i >= len(convex_layers):
-                    return [scat, line] + previous_hulls + verified_hulls
-                    
-                layer = convex_layers[i]
-                is_last_layer = (i == len(convex_layers) - 1)
-                
-                # Handle different cases based on number of points in layer
-                if len(layer) >= 3:
-                    # Normal convex hull - close the loop
-                    x = np.append(layer[:, 0], layer[0, 0])
-                    y = np.append(layer[:, 1], layer[0, 1])
-                elif len(layer) == 2:
-                    # Line segment - no need to close loop
-                    x = layer[:, 0]
-                    y = layer[:, 1]
-                else:  # Single point
-                    if is_last_layer:
-                        # For last layer single point, make it visible as a point
-                        line.set_data([], [])  # Clear the line
-                        point_idx = np.where((points == layer[0]).all(axis=1))[0][0]
-                        current_colors = np.array([POINTS_COLOR] * len(points))
-                        current_colors[point_idx] = CURRENT_HULL_COLOR
-                        scat.set_color(current_colors)
-                        return [scat, line] + previous_hulls + verified_hulls
-                    else:
-                        # For non-last layer single points, use tiny line segment
-                        x = np.array([layer[0, 0], layer[0, 0]])
-                        y = np.array([layer[0, 1], layer[0, 1]])
+                # frame is a render_plan.RenderFrame: the layer's indices and polyline
+                # are precomputed, so this only applies array updates
+                if frame.colors is not None:
+                    # Last layer is a single point: show it highlighted instead of a line
+                    line.set_data([], [])  # Clear the line
+                    scat.set_color(frame.colors)
+                    return [scat, line] + hulls.artists
                 
                 # Update the main line
-                line.set_data(x, y)
+                line.set_data(frame.x, frame.y)
                 
-                # Find indices of current hull points in the original dataset
-                hull_indices = [np.where((points == point).all(axis=1))[0][0] for point in layer]
-                
-                if not is_last_layer:
-                    # Not the last layer - fade previous hulls
-                    for hull in previous_hulls:
-                        hull.set_color(CHECKED_HULL_COLOR)
-                        hull.set_alpha(0.4)
-                        verified_hulls.append(hull)
-                    previous_hulls.clear()
-                    
-                    # Add current hull to previous_hulls
-                    hull_line, = ax.plot(x, y, CHECKED_HULL_COLOR, lw=1, alpha=0.6)
-                    previous_hulls.append(hull_line)
+                if not frame.is_last:
+                    # Not the last layer - the previous hull joins the verified ones
+                    hulls.check(frame.x, frame.y)
                     
                     # Reduce opacity of points in this hull
-                    for idx in hull_indices:
-                        alphas[idx] *= 0.5
+                    alphas[frame.indices] *= 0.5
                 else:
                     # Last layer - keep it distinct
-                    if len(layer) > 1:  # Only create hull line if more than one point
-                        hull_line, = ax.plot(x, y, CURRENT_HULL_COLOR, lw=2, alpha=1.0)
-                        previous_hulls.append(hull_line)
+                    if len(frame.indices) > 1:  # Only draw a hull line if more than one point
+                        hulls.finish(frame.x, frame.y)
                 
                 # Update scatter plot alphas
                 scat.set_alpha(alphas)
@@ -173,21 +193,26 @@ if __name__ == "__main__":
                 # Reset point colors to default (in case we had a red point before)
                 scat.set_color(POINTS_COLOR)
                 
-                return [scat, line] + previous_hulls + verified_hulls
+                return [scat, line] + hulls.artists
 
             # Create animation
             ani = FuncAnimation(
                 fig, animate, 
-                frames=len(convex_layers), 
+                frames=frames, 
                 init_func=init, blit=True, 
                 interval=ANIMATION_INTERVAL_MS, 
-                repeat=False
+                repeat=False,
+                # There are at most as many layers as points
+                save_count=len(points),
+                cache_frame_data=False
             )
+            # Verified hulls are drawn into the blit background, once each
+            hulls.bind(ani)
 
-            # Save animation
-            ani.save('convex_ani.gif',
-                     writer='pillow',
-                     fps=60)
+            # Export the animation headlessly, on its own Agg figures
+            if EXPORT_ANIMATION:
+                export_animation(points, None if LAZY_LAYERS else convex_layers,
+                                 EXPORT_PATH.format(points=points_in_list), title=TITLE_WINDOW)
 
             # Add legend
             ax.legend(
@@ -18,7 +18,9 @@ sys.path.append('.')  # Add current directory to python path
 
 
 # Import from existing project files
-from convexhull_quickhull_implementation import ConvexHull_QuickHull as ConvexHull
+from convex_layers import iter_convex_layers
+from layer_cache import cached_convex_layers, default_cache
+from render_plan import HullArtists, build_render_plan, render_frames
 import config
 
 class ConvexHullVisualizationApp:
@@ -101,96 +103,40 @@ class ConvexHullVisualizationApp:
         )
         line, = ax.plot([], [], 'r-', lw=config.LINE_SIZE, label='Current Convex Hull')
 
-        # Compute convex layers (existing function)
-        def compute_convex_layers(points):
-            layers = []
-            remaining_points = points.copy()
-            
-            while len(remaining_points) > 0:
-                if len(remaining_points) >= 3:
-                    hull = ConvexHull(remaining_points)
-                    layers.append(remaining_points[hull.vertices])
-                    remaining_points = np.delete(remaining_points, hull.vertices, axis=0)
-                else:
-                    # Handle cases with 1 or 2 points
-                    if len(remaining_points) == 2:
-                        layers.append(remaining_points)
-                    elif len(remaining_points) == 1:
-                        layers.append(remaining_points)
-                    remaining_points = np.array([])
-                
-            return layers
-
         # Animation setup
         alphas = np.ones(len(points))
-        previous_hulls = []
-        verified_hulls = []
+        # Checked and last-layer hulls, in a fixed number of artists
+        hulls = HullArtists(ax, config.CHECKED_HULL_COLOR, config.CURRENT_HULL_COLOR)
 
         def init():
             line.set_data([], [])
             scat.set_alpha(alphas)
-            return [scat, line] + previous_hulls + verified_hulls
+            return [scat, line] + hulls.artists
 
-        def animate(i):
-            nonlocal alphas, previous_hulls, verified_hulls
-            
-            if i >= len(convex_layers):
-                return [scat, line] + previous_hulls + verified_hulls
-                
-            layer = convex_layers[i]
-            is_last_layer = (i == len(convex_layers) - 1)
+        def animate(frame):
+            nonlocal alphas
             
-            # Handle different cases based on number of points in layer
-            if len(layer) >= 3:
-                # Normal convex hull - close the loop
-                x = np.append(layer[:, 0], layer[0, 0])
-                y = np.append(layer[:, 1], layer[0, 1])
-            elif len(layer) == 2:
-                # Line segment - no need to close loop
-                x = layer[:, 0]
-                y = layer[:, 1]
-            else:  # Single point
-                if is_last_layer:
-                    # For last layer single point, make it visible as a point
-                    line.set_data([], [])  # Clear the line
-                    # Find the index of this point in the original dataset
-                    point_idx = np.where((points == layer[0]).all(axis=1))[0][0]
-                    # Update the scatter plot to show this point in red
-                    current_colors = np.array([config.POINTS_COLOR] * len(points))
-                    current_colors[point_idx] = config.CURRENT_HULL_COLOR
-                    scat.set_color(current_colors)
-                    return [scat, line] + previous_hulls + verified_hulls
-                else:
-                    # For non-last layer single points, use tiny line segment
-                    x = np.array([layer[0, 0], layer[0, 0]])
-                    y = np.array([layer[0, 1], layer[0, 1]])
+            # frame is a render_plan.RenderFrame: the layer's indices and polyline
+            # are precomputed, so this only applies array updates
+            if frame.colors is not None:
+                # Last layer is a single point: show it highlighted instead of a line
+                line.set_data([], [])  # Clear the line
+                scat.set_color(frame.colors)
+                return [scat, line] + hulls.artists
             
             # Update the main line
-            line.set_data(x, y)
+            line.set_data(frame.x, frame.y)
             
-            # Find indices of current hull points in the original dataset
-            hull_indices = [np.where((points == point).all(axis=1))[0][0] for point in layer]
-            
-            if not is_last_layer:
-                # Not the last layer - fade previous hulls
-                for hull in previous_hulls:
-                    hull.set_color(config.CHECKED_HULL_COLOR)
-                    hull.set_alpha(0.4)
-                    verified_hulls.append(hull)
-                previous_hulls.clear()
-                
-                # Add current hull to previous_hulls
-                hull_line, = ax.plot(x, y, config.CHECKED_HULL_COLOR, lw=1, alpha=0.6)
-                previous_hulls.append(hull_line)
+            if not frame.is_last:
+                # Not the last layer - the previous hull joins the verified ones
+                hulls.check(frame.x, frame.y)
                 
                 # Reduce opacity of points in this hull
-                for idx in hull_indices:
-                    alphas[idx] *= 0.5
+                alphas[frame.indices] *= 0.5
             else:
                 # Last layer - keep it distinct
-                if len(layer) > 1:  # Only create hull line if more than one point
-                    hull_line, = ax.plot(x, y, config.CURRENT_HULL_COLOR, lw=2, alpha=1.0)
-                    previous_hulls.append(hull_line)
+                if len(frame.indices) > 1:  # Only draw a hull line if more than one point
+                    hulls.finish(frame.x, frame.y)
             
             # Update scatter plot alphas
             scat.set_alpha(alphas)
@@ -198,34 +144,57 @@ class ConvexHullVisualizationApp:
             # Reset point colors to default (in case we had a red point before)
             scat.set_color(config.POINTS_COLOR)
             
-            return [scat, line] + previous_hulls + verified_hulls
-
-        # Compute convex layers
-        tracemalloc.start()
-        start_time = time.time()
-        convex_layers = compute_convex_layers(points)
-        end_time = time.time()
-
-        # Performance logging
-        snapshot_after = tracemalloc.take_snapshot()
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-
-        print("\n_______________________________________________")
-        print(f"Points volume: {points_count}")
-        print(f"Peak Memory Usage: {peak / 1024:.2f} KB")
-        print(f"Time taken to compute convex layers: {end_time - start_time:.4f} seconds")
-        print(f"Layers computed: {len(convex_layers)}")
+            return [scat, line] + hulls.artists
+
+        if config.LAZY_LAYERS:
+            # Layers are peeled while the animation plays
+            def frames():
+                layers = iter_convex_layers(points, engine=config.LAYERS_ENGINE,
+                                            prefilter=config.LAYERS_PREFILTER, dedup=config.LAYERS_DEDUP,
+                                            hull_engine=config.LAYERS_HULL_ENGINE, indices=True)
+                return render_frames(points, layers, config.POINTS_COLOR, config.CURRENT_HULL_COLOR)
+        else:
+            # Compute convex layers
+            tracemalloc.start()
+            start_time = time.time()
+            convex_layers = cached_convex_layers(points, engine=config.LAYERS_ENGINE,
+                                                 prefilter=config.LAYERS_PREFILTER, dedup=config.LAYERS_DEDUP,
+                                                 hull_engine=config.LAYERS_HULL_ENGINE, output="csr")
+            end_time = time.time()
+
+            # Performance logging
+            snapshot_after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            print("\n_______________________________________________")
+            print(f"Points volume: {points_count}")
+            print(f"Peak Memory Usage: {peak / 1024:.2f} KB")
+            print(f"Time taken to compute convex layers: {end_time - start_time:.4f} seconds")
+            print(f"Layers computed: {len(convex_layers)}")
+            if config.LAYER_CACHE:
+                print(f"Layer cache: {default_cache().summary()}")
+
+            # Everything animate() needs, worked out before the first frame
+            render_plan = build_render_plan(points, convex_layers, config.POINTS_COLOR, config.CURRENT_HULL_COLOR)
+
+            def frames():
+                return iter(render_plan)
 
         # Create animation
         ani = FuncAnimation(
             fig, animate, 
-            frames=len(convex_layers), 
+            frames=frames, 
             init_func=init, 
             blit=True, 
             interval=animation_interval, 
-            repeat=False
+            repeat=False,
+            # There are at most as many layers as points
+            save_count=len(points),
+            cache_frame_data=False
         )
+        # Verified hulls are drawn into the blit background, once each
+        hulls.bind(ani)
 
         # Add legend
         ax.legend(
@@ -0,0 +1,126 @@
+import sys
+import time
+
+import numpy as np
+from hull_engines import ConvexHull
+from predicates import lexicographic_extremes
+from config import *
+
+
+def open_points(source, raw_dtype=np.float64):
+    """
+    Memory-map a point file without reading it.
+
+    Args:
+        source (str or numpy.ndarray): Path to a .npy file of shape (n, 2),
+            a raw binary file of interleaved x, y values, or an array that is
+            already in memory / mapped.
+        raw_dtype: Element type of raw binary files.
+
+    Returns:
+        np.ndarray: Read-only (n, 2) view of the points.
+    """
+    if not isinstance(source, str):
+        points = source
+    elif source.endswith(".npy"):
+        points = np.load(source, mmap_mode="r")
+    else:
+        points = np.memmap(source, dtype=raw_dtype, mode="r").reshape(-1, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError(f"Expected points of shape (n, 2), got {points.shape}")
+    return points
+
+
+class OutOfCoreConvexHull:
+    def __init__(self, source, chunk_size=OUT_OF_CORE_CHUNK_SIZE, engine="indexed",
+                 prefilter=True, raw_dtype=np.float64, progress=None):
+        """
+        Convex hull of a point file too large to load, read in fixed-size
+        chunks.
+
+        Each chunk is hulled together with the hull of everything before it,
+        so at most chunk_size + h points are in memory at once. The running
+        hull is kept in input order, which makes the tie-breaks (duplicates,
+        leftmost point) the same as a single in-memory ConvexHull_QuickHull.
+
+        Parameters:
+        source (str or numpy.ndarray): .npy path, raw binary path, or array
+        chunk_size (int): Rows read per chunk
+        engine (str): Hull engine (see hull_engines) for the chunk hulls
+        prefilter (bool): Run the octagon prefilter on every chunk
+        raw_dtype: Element type of raw binary files
+        progress (callable): Optional; called after every chunk with
+            (points done, total points, seconds so far)
+        """
+        self.source = source
+        mapped = open_points(source, raw_dtype)
+        total = len(mapped)
+
+        hull_points = np.empty((0, 2))
+        hull_rows = np.empty(0, dtype=np.int64)
+        # Hull order of the running hull, which is itself kept in input order
+        order = np.empty(0, dtype=np.intp)
+
+        start_time = time.perf_counter()
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            chunk = np.asarray(mapped[start:stop], dtype=float)
+
+            # Earlier rows first, so input order is kept
+            candidates = np.concatenate((hull_points, chunk))
+            rows = np.concatenate((hull_rows, np.arange(start, stop, dtype=np.int64)))
+            hull = ConvexHull(candidates, engine=engine, prefilter=prefilter)
+
+            keep = np.sort(hull.vertices)
+            if len(keep) == 1:
+                # Candidates on one vertical line collapse to their lowest
+                # point, but the top one can still be a vertex once later
+                # chunks widen the hull
+                keep = np.unique(lexicographic_extremes(candidates))
+            hull_points = candidates[keep]
+            hull_rows = rows[keep]
+            order = np.searchsorted(keep, hull.vertices)
+
+            if progress is not None:
+                progress(stop, total, time.perf_counter() - start_time)
+
+        self.seconds = time.perf_counter() - start_time
+        self.points_processed = total
+        self.points_per_second = total / self.seconds if self.seconds > 0 else float("inf")
+
+        self.vertices = hull_rows[order]
+        self.hull_points = hull_points[order]
+        self._compute_additional_properties()
+
+    def _compute_additional_properties(self):
+        """
+        Simplices and area, as in ConvexHull_QuickHull (vertices are row
+        numbers in the file).
+        """
+        self.simplices = np.column_stack([self.vertices, np.roll(self.vertices, -1)])
+
+        x = self.hull_points[:, 0]
+        y = self.hull_points[:, 1]
+        self.area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+
+    def __len__(self):
+        """Return number of vertices in convex hull"""
+        return len(self.vertices)
+
+
+if __name__ == "__main__":
+    # python out_of_core_hull.py points.npy [chunk_size]
+    path = sys.argv[1]
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else OUT_OF_CORE_CHUNK_SIZE
+
+    def report(done, total, seconds):
+        rate = done / seconds if seconds > 0 else float("inf")
+        print(f"{done:>12}/{total} points  {seconds:8.2f}s  {rate:14,.0f} points/s", flush=True)
+
+    hull = OutOfCoreConvexHull(path, chunk_size=chunk_size, progress=report)
+    print("\n_______________________________________________")
+    print(f"Points volume: {hull.points_processed}")
+    print(f"Hull vertices: {len(hull)}")
+    print(f"Hull area: {hull.area:.4f}")
+    print(f"Time taken: {hull.seconds:.4f} seconds")
+    print(f"Throughput: {hull.points_per_second:,.0f} points/s")
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class DeduplicatedPoints:
+    def __init__(self, points):
+        """
+        Distinct coordinates of a point set, found with one lexsort, and the
+        index arrays that map results on them back to the input.
+
+        Hulls and layers are computed on the distinct points only; a dataset
+        of repeated readings shrinks before any hull is run, and no engine
+        has to tell copies apart by coordinate.
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+
+        Attributes:
+        points (numpy.ndarray): Distinct points in (x, y) order, shape (u, 2)
+        inverse (numpy.ndarray): Distinct row of every input point, so that
+            input[i] == points[inverse[i]]
+        first (numpy.ndarray): Lowest input index of every distinct point
+        counts (numpy.ndarray): Number of copies of every distinct point
+        order (numpy.ndarray): Input indices grouped by distinct point,
+            ascending within a group; copies of distinct point u are
+            order[starts[u]:starts[u] + counts[u]]
+        starts (numpy.ndarray): Start of every group in order
+        """
+        points = np.asarray(points, dtype=float)
+        n = len(points)
+        # lexsort is stable, so each group lists its copies by input index
+        self.order = np.lexsort((points[:, 1], points[:, 0]))
+        sorted_points = points[self.order]
+
+        new_group = np.ones(n, dtype=bool)
+        np.any(sorted_points[1:] != sorted_points[:-1], axis=1, out=new_group[1:])
+        self.starts = np.flatnonzero(new_group)
+        self.counts = np.diff(np.append(self.starts, n))
+        self.points = sorted_points[self.starts]
+        self.first = self.order[self.starts]
+
+        self.inverse = np.empty(n, dtype=np.intp)
+        self.inverse[self.order] = np.cumsum(new_group) - 1
+
+    @property
+    def has_duplicates(self):
+        return len(self.points) < len(self.inverse)
+
+    def copies(self, rows):
+        """
+        Every input index of the given distinct points, the copies of one
+        point next to each other (in the order of rows).
+
+        Returns numpy.ndarray of input indices
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        counts = self.counts[rows]
+        # Position of each output entry inside its group
+        group_ends = np.cumsum(counts)
+        within = np.arange(group_ends[-1] if len(rows) else 0) - np.repeat(group_ends - counts, counts)
+        return self.order[np.repeat(self.starts[rows], counts) + within]
+
+    def __len__(self):
+        """Return number of distinct points"""
+        return len(self.points)
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def generate_grid_points(grid_size, x_range, y_range):
+    """
+    Generate points in a grid format based on the specified grid size and ranges.
+
+    Args:
+        grid_size (int): Number of points along one axis of the grid.
+        x_range (float): Maximum value for the x-coordinate.
+        y_range (float): Maximum value for the y-coordinate.
+
+    Returns:
+        np.ndarray: Array of generated points in a grid.
+    """
+    x_values = np.linspace(0, x_range, grid_size)
+    y_values = np.linspace(0, y_range, grid_size)
+
+    x_grid, y_grid = np.meshgrid(x_values, y_values)
+    return np.vstack([x_grid.ravel(), y_grid.ravel()]).T
+
+
+def generate_collinear_points(n, x_range=1000):
+    """
+    Generate n collinear points along the horizontal line y = 500.
+
+    Args:
+        n (int): Number of points to generate.
+        x_range (float): The range of x-values for the points.
+
+    Returns:
+        np.ndarray: Array of n collinear points.
+    """
+    x = np.linspace(0, x_range, n)
+    y = np.linspace(500, 500, n)
+    return np.vstack([x, y]).T
+
+
+def generate_points(gen_mode, n, x_range=1000, y_range=1000, points_range=1000, rng=None):
+    """
+    Generate n points the same way main.py does for each GEN_MODE.
+
+    Args:
+        gen_mode (str): 'grid', 'random' or 'collinear'.
+        n (int): Number of points requested (grid mode rounds down to a square).
+        rng (np.random.Generator): Source for 'random' mode; defaults to the
+            global np.random state, like the scripts.
+
+    Returns:
+        np.ndarray: Array of generated points with shape (n, 2).
+    """
+    if gen_mode == "grid":
+        grid_size = int(np.sqrt(n))
+        return generate_grid_points(grid_size, x_range, y_range)
+    elif gen_mode == "random":
+        if rng is None:
+            return np.random.rand(n, 2) * points_range
+        return rng.random((n, 2)) * points_range
+    elif gen_mode == "collinear":
+        return generate_collinear_points(n, x_range)
+    else:
+        raise ValueError(f"Unknown generation method: {gen_mode}")
@@ -0,0 +1,237 @@
+import numpy as np
+
+# Half an ulp of 1.0 (2^-53), the relative rounding error of one operation
+EPSILON = np.finfo(float).eps / 2
+
+# Shewchuk's error bound for the float orientation determinant: when
+# |det| > ORIENTATION_ERRBOUND * (|left| + |right|) its sign is the exact one.
+# Like Shewchuk's orient2d, this assumes no overflow or underflow.
+ORIENTATION_ERRBOUND = (3.0 + 16.0 * EPSILON) * EPSILON
+
+# Up to this many uncertain entries are settled one by one; more go through
+# one vectorized pass over Python integers
+_SCALAR_FALLBACK_MAX = 32
+
+
+def orientation_bound(points):
+    """
+    Static error bound for orientation tests among points: a float
+    determinant of any three of them whose magnitude exceeds it has the
+    exact sign.
+
+    Every coordinate difference is at most the bounding box width / height,
+    so |left| + |right| <= 2 * width * height. One comparison against this
+    settles nearly every test of a non-degenerate input, without the
+    per-entry bound.
+
+    Returns float
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return 0.0
+    # Per column: an axis=0 reduction over (n, 2) rows is many times slower
+    x = points[:, 0]
+    y = points[:, 1]
+    width = x.max() - x.min()
+    height = y.max() - y.min()
+    # Slack for the rounding of this product itself
+    return ORIENTATION_ERRBOUND * (1.0 + 8.0 * EPSILON) * 2.0 * width * height
+
+
+def orientation(ax, ay, bx, by, cx, cy, bound=None):
+    """
+    Orientation determinant (b - a) x (c - a) with an exact sign, vectorized.
+
+    The determinant is evaluated in floating point first. Only the entries
+    within the rounding error bound of zero are recomputed exactly, in
+    integer arithmetic, and replaced by -1.0, 0.0 or +1.0. Random inputs
+    almost never need the exact pass; a determinant made of two exactly
+    zero products (points sharing a coordinate with a) is already exact.
+
+    Args:
+        ax, ay, bx, by, cx, cy: Coordinates of a, b and c; arrays or
+            scalars, broadcast against each other.
+        bound (float): Optional orientation_bound() of a point set holding
+            every a, b and c. Only determinants within it of zero are
+            looked at again; without it every entry gets its own bound.
+
+    Returns:
+        np.ndarray: Float values whose sign is exact: positive if c is left
+            of a -> b (counter-clockwise turn), negative if right, zero if
+            the three points are collinear. Only the sign is meaningful.
+    """
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    det = np.asarray(left - right)
+    if bound is not None:
+        near = np.abs(det) <= bound
+    else:
+        errbound = np.abs(left) + np.abs(right)
+        errbound *= ORIENTATION_ERRBOUND
+        near = (np.abs(det) <= errbound) & (errbound > 0)
+    if near.any():
+        _settle(det, near, (ax, ay, bx, by, cx, cy))
+    return det
+
+
+def line_orientation(line_start, line_end, points, bound):
+    """
+    orientation() of every point of an (n, 2) array against one line.
+
+    The QuickHull partitions run this on every recursion call, so the
+    determinant is built in place and the static bound is checked with a
+    single min() before anything else is looked at.
+
+    Args:
+        line_start, line_end: The line's two points.
+        points (np.ndarray): Points to classify, shape (n, 2).
+        bound (float): orientation_bound() of a set holding all of them.
+
+    Returns:
+        np.ndarray: Float values whose sign is exact, as orientation().
+    """
+    ax, ay = line_start[0], line_start[1]
+    bx, by = line_end[0], line_end[1]
+    det = np.subtract(points[:, 1], ay)
+    det *= bx - ax
+    scratch = np.subtract(points[:, 0], ax)
+    scratch *= by - ay
+    det -= scratch
+    if len(det) == 0 or np.abs(det, out=scratch).min() > bound:
+        return det
+    _settle(det, scratch <= bound, (ax, ay, bx, by, points[:, 0], points[:, 1]))
+    return det
+
+
+def _settle(det, near, coordinates):
+    """
+    Replace det at the near-zero entries by their exact signs.
+
+    The few entries a static bound flags are first checked against their
+    own (much tighter) error bound; only what is still uncertain is
+    computed exactly.
+    """
+    positions = np.flatnonzero(near)
+    columns = []
+    for c in coordinates:
+        c = np.asarray(c, dtype=float)
+        if c.ndim == 0:
+            columns.append(np.full(len(positions), c))
+        else:
+            if c.shape != det.shape:
+                c = np.broadcast_to(c, det.shape)
+            columns.append(c.reshape(-1)[positions])
+    if len(positions) <= _SCALAR_FALLBACK_MAX:
+        signs = [orientation_sign(*map(float, entry)) for entry in zip(*columns)]
+    else:
+        ax, ay, bx, by, cx, cy = columns
+        left = (bx - ax) * (cy - ay)
+        right = (by - ay) * (cx - ax)
+        signs = left - right
+        errbound = ORIENTATION_ERRBOUND * (np.abs(left) + np.abs(right))
+        uncertain = (np.abs(signs) <= errbound) & (errbound > 0)
+        if uncertain.any():
+            signs[uncertain] = _exact_orientation(*(c[uncertain] for c in columns))
+    det.reshape(-1)[positions] = signs
+
+
+def _exact_orientation(ax, ay, bx, by, cx, cy):
+    """
+    Exact orientation signs of many entries, in integer arithmetic.
+
+    Every float is m * 2^e with an integer 53-bit mantissa m. Shifting the
+    six coordinates of an entry onto their smallest exponent turns them into
+    Python integers with the same ratios, so the determinant (scaled by a
+    positive power of two) is computed without rounding.
+
+    Returns np.ndarray of int8 signs
+    """
+    values = np.array([ax, ay, bx, by, cx, cy], dtype=float)
+    mantissa, exponent = np.frexp(values)
+    mantissa = np.ldexp(mantissa, 53).astype(np.int64)
+    # Zeros must not pull the common exponent down
+    exponent = np.where(mantissa == 0, exponent.max(axis=0), exponent)
+    shift = exponent - exponent.min(axis=0)
+
+    ax, ay, bx, by, cx, cy = mantissa.astype(object) << shift.astype(object)
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (det > 0).astype(np.int8) - (det < 0).astype(np.int8)
+
+
+def _exact_sign(ax, ay, bx, by, cx, cy):
+    """
+    Exact orientation sign of one entry: the floats as integer ratios over
+    a common power-of-two denominator.
+    """
+    if (cx == ax and cy == ay) or (cx == bx and cy == by) or (ax == bx and ay == by):
+        return 0
+    ratios = [value.as_integer_ratio() for value in (ax, ay, bx, by, cx, cy)]
+    denominator = max(d for _, d in ratios)
+    ax, ay, bx, by, cx, cy = [n * (denominator // d) for n, d in ratios]
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (det > 0) - (det < 0)
+
+
+def orientation_sign(ax, ay, bx, by, cx, cy):
+    """
+    orientation() for one triple of Python floats, for the scalar loops
+    (which call it only when their float determinant is within
+    orientation_bound() of zero).
+
+    Returns int: +1, -1 or 0
+    """
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    det = left - right
+    bound = ORIENTATION_ERRBOUND * (abs(left) + abs(right))
+    if det > bound:
+        return 1
+    if -det > bound:
+        return -1
+    if bound == 0:
+        return 0
+    return _exact_sign(ax, ay, bx, by, cx, cy)
+
+
+def farthest_exact(line_start, line_end, points):
+    """
+    Position of the point of points (n, 2) farthest from the line through
+    line_start -> line_end, in exact arithmetic.
+
+    For candidates whose float distances are too close to rank. Of exactly
+    tied points (a run parallel to the line) the one nearest line_start
+    along the line wins, so the pick is always a hull vertex and never the
+    middle of a collinear run.
+
+    Returns int
+    """
+    values = [float(value) for value in (*line_start[:2], *line_end[:2], *np.ravel(points))]
+    ratios = [value.as_integer_ratio() for value in values]
+    denominator = max(d for _, d in ratios)
+    ax, ay, bx, by, *rest = [n * (denominator // d) for n, d in ratios]
+
+    best, best_key = 0, None
+    for i in range(len(rest) // 2):
+        cx, cy = rest[2 * i], rest[2 * i + 1]
+        distance = abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+        along = (cx - ax) * (bx - ax) + (cy - ay) * (by - ay)
+        key = (distance, -along)
+        if best_key is None or key > best_key:
+            best, best_key = i, key
+    return best
+
+
+def lexicographic_extremes(points):
+    """
+    Indices of the lexicographically smallest and largest points (x first,
+    then y) of an (n, 2) array: hull vertices even when several points share
+    the extreme x coordinate.
+
+    Returns (int, int)
+    """
+    x = points[:, 0]
+    ends = []
+    for extreme, pick in ((x.min(), np.argmin), (x.max(), np.argmax)):
+        ties = np.flatnonzero(x == extreme)
+        ends.append(int(ties[pick(points[ties, 1])]))
+    return ends[0], ends[1]
@@ -0,0 +1,183 @@
+from collections import namedtuple
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+
+from convex_layers import layer_frames
+
+# One animation frame of the convex layers:
+#   index    layer number
+#   indices  point indices of the layer (the points to fade)
+#   x, y     polyline to draw, already closed for 3+ points
+#   is_last  whether this is the innermost layer
+#   colors   (n, 4) RGBA point colors with the layer's point highlighted,
+#            for a single-point last layer; None otherwise
+RenderFrame = namedtuple("RenderFrame", ["index", "indices", "x", "y", "is_last", "colors"])
+
+
+def render_frames(points, layers, point_color, highlight_color):
+    """
+    Turn layers of point indices into ready-to-draw animation frames.
+
+    Everything animate() used to look up per frame (coordinate searches for
+    the layer's indices, closing the polyline, the highlight color array)
+    is done here once per layer, so a frame only has to apply array updates.
+
+    Parameters:
+    points (numpy.ndarray): Array of points with shape (n, 2)
+    layers (iterable): Index arrays, outermost first: a list, a
+        ConvexLayersCSR, or iter_convex_layers(..., indices=True) to build
+        frames lazily
+    point_color: Matplotlib color of the points
+    highlight_color: Color of a single-point last layer, or a function of
+        the layer number returning one
+
+    Yields RenderFrame
+    """
+    points = np.asarray(points)
+    for i, indices, is_last in layer_frames(layers):
+        layer = points[indices]
+        colors = None
+        if len(layer) >= 3:
+            # Closed polygon
+            x = np.append(layer[:, 0], layer[0, 0])
+            y = np.append(layer[:, 1], layer[0, 1])
+        elif len(layer) == 2:
+            x = layer[:, 0]
+            y = layer[:, 1]
+        elif is_last:
+            # Shown as a highlighted point instead of a line
+            x = y = np.empty(0)
+            color = highlight_color(i) if callable(highlight_color) else highlight_color
+            colors = np.repeat(to_rgba_array(point_color), len(points), axis=0)
+            colors[indices] = to_rgba(color)
+        else:
+            # Degenerate segment so the point still gets a hull line
+            x = np.repeat(layer[0, 0], 2)
+            y = np.repeat(layer[0, 1], 2)
+        yield RenderFrame(i, indices, x, y, is_last, colors)
+
+
+def build_render_plan(points, layers, point_color, highlight_color):
+    """All frames of render_frames up front, as a list."""
+    return list(render_frames(points, layers, point_color, highlight_color))
+
+
+class HullCollection:
+    """
+    Every hull line drawn so far, held in one LineCollection.
+
+    Returning one ax.plot line per shown layer from animate() makes blitting
+    redraw all of them on every frame: O(L) artists per frame, O(L^2) for
+    the whole animation. Once bound to a blitting animation (bind()), a new
+    line is instead drawn once into the animation's cached background, so a
+    frame only draws the line it adds and the collection is not one of the
+    blit artists. The collection keeps every line for full redraws (the
+    first draw, a resize), and is handed the new ones only then.
+    """
+
+    def __init__(self, ax, **kwargs):
+        self.ax = ax
+        self.collection = _DeferredLineCollection(**kwargs)
+        # Keep the axes limits set by the script
+        ax.add_collection(self.collection, autolim=False)
+        # Draws one new line into the background; animated, so full redraws
+        # skip it
+        self._stroke = LineCollection([], animated=True, **kwargs)
+        ax.add_collection(self._stroke, autolim=False)
+        self._animation = None
+        self._colors = np.empty((0, 4))
+
+    def bind(self, animation):
+        """Draw new lines into the blit background of a FuncAnimation."""
+        self._animation = animation
+
+    def append(self, x, y, color=None):
+        """Add one hull polyline, optionally in its own color."""
+        segment = np.column_stack((x, y))
+        self.collection.segments.append(segment)
+        if color is not None:
+            count = len(self.collection.segments)
+            if count > len(self._colors):
+                # Double the capacity, so growing stays amortized O(1)
+                self._colors = np.resize(self._colors, (max(2 * count, 16), 4))
+            self._colors[count - 1] = to_rgba(color)
+            self.collection.colors = self._colors[:count]
+        self._draw_into_background(segment, color)
+
+    def _draw_into_background(self, segment, color):
+        """
+        Draw segment onto the canvas and keep it in the animation's cached
+        background. animate() runs right after the background is restored,
+        so the canvas is the background plus this line.
+        """
+        animation = self._animation
+        if animation is None or not getattr(animation, "_blit", False):
+            return
+        canvas = self.ax.figure.canvas
+        self._stroke.set_segments([segment])
+        if color is not None:
+            self._stroke.set_color(color)
+        self.ax.draw_artist(self._stroke)
+        self._stroke.set_segments([])
+        # Without a cached background yet, the first blit copies the canvas
+        # with the line already on it
+        cache = animation._blit_cache
+        if self.ax in cache:
+            view, _ = cache[self.ax]
+            cache[self.ax] = (view, canvas.copy_from_bbox(self.ax.bbox))
+
+
+class _DeferredLineCollection(LineCollection):
+    """
+    LineCollection whose appended segments (and colors) are turned into
+    paths only when it is drawn.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__([], **kwargs)
+        self.segments = []
+        self.colors = None
+        self._drawn = 0
+
+    def draw(self, renderer):
+        if self._drawn != len(self.segments):
+            self.set_segments(self.segments)
+            if self.colors is not None:
+                self.set_color(self.colors)
+            self._drawn = len(self.segments)
+        super().draw(renderer)
+
+
+class HullArtists:
+    """
+    The hull lines of the layer animation in a fixed set of artists: the
+    verified hulls (one HullCollection, drawn into the blit background),
+    the most recently checked hull, and the highlighted last layer.
+    """
+
+    def __init__(self, ax, checked_color, current_color):
+        self.verified = HullCollection(ax, colors=checked_color, linewidths=1, alpha=0.4)
+        self.previous, = ax.plot([], [], checked_color, lw=1, alpha=0.6)
+        self.last, = ax.plot([], [], current_color, lw=2, alpha=1.0)
+
+    def bind(self, animation):
+        """Draw verified hulls into the blit background of animation."""
+        self.verified.bind(animation)
+
+    def check(self, x, y):
+        """Show a checked layer; the one before it moves to the verified hulls."""
+        previous_x, previous_y = self.previous.get_data()
+        if len(previous_x):
+            self.verified.append(previous_x, previous_y)
+        self.previous.set_data(x, y)
+
+    def finish(self, x, y):
+        """Show the last layer."""
+        self.last.set_data(x, y)
+
+    @property
+    def artists(self):
+        """Blit artists; the verified hulls are in the background instead."""
+        return [self.previous, self.last]
@@ -0,0 +1,173 @@
+import heapq
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from hull_engines import ConvexHull, _sorted_hull
+from predicates import lexicographic_extremes
+from config import *
+
+
+class ShardedConvexHull:
+    def __init__(self, points, workers=SHARDED_HULL_WORKERS, shards=None, engine="indexed", prefilter=True):
+        """
+        Convex hull of a large point array, split into contiguous shards
+        whose hulls are computed in a process pool and merged pairwise.
+
+        The points are copied once into a shared memory block that every
+        worker maps, so no shard is pickled; a worker only sends back the
+        vertex indices of its shard's hull. The partial hulls are merged in
+        a reduction tree: two hulls whose vertices are in (x, y) order are
+        merged like sorted lists and their hull is one monotone chain pass,
+        linear in the vertices of the two.
+
+        vertices are the same as ConvexHull_QuickHull(points).vertices:
+        clockwise from the leftmost point, a repeated point by its lowest
+        index.
+
+        Parameters:
+        points (numpy.ndarray): Array of points with shape (n, 2)
+        workers (int): Worker processes (None = every core); 1 hulls the
+            shards inline
+        shards (int): Number of shards (default: one per worker)
+        engine (str): Hull engine (see hull_engines) for the shard hulls
+        prefilter (bool): Run the octagon prefilter on every shard
+        """
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError(f"Expected points of shape (n, 2), got {points.shape}")
+        self.points = points
+        self.workers = workers or os.cpu_count() or 1
+        shards = min(shards or self.workers, max(len(points), 1))
+        edges = np.linspace(0, len(points), shards + 1).astype(np.intp)
+        bounds = list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+        start_time = time.perf_counter()
+        partial = self._shard_hulls(bounds, engine, prefilter)
+        # Reduction tree: merge neighbouring hulls until one is left
+        while len(partial) > 1:
+            merged = [_merge_hulls(points, a, b) for a, b in zip(partial[::2], partial[1::2])]
+            if len(partial) % 2:
+                merged.append(partial[-1])
+            partial = merged
+        self.vertices = _hull_order(points, partial[0] if partial else np.empty(0, dtype=np.intp))
+        self.seconds = time.perf_counter() - start_time
+
+        self._compute_additional_properties()
+
+    def _shard_hulls(self, bounds, engine, prefilter):
+        """Vertex indices of every shard's hull, each in (x, y) order."""
+        if self.workers == 1 or len(bounds) == 1:
+            _init_worker(None, self.points, engine, prefilter)
+            return [_shard_hull(shard) for shard in bounds]
+
+        memory = shared_memory.SharedMemory(create=True, size=max(self.points.nbytes, 1))
+        try:
+            shared = np.ndarray(self.points.shape, dtype=np.float64, buffer=memory.buf)
+            shared[:] = self.points
+            initargs = (memory.name, self.points.shape, engine, prefilter)
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                partial = list(pool.map(_shard_hull, bounds))
+            del shared
+        finally:
+            memory.close()
+            memory.unlink()
+        return partial
+
+    def _compute_additional_properties(self):
+        """
+        Hull points, simplices and area, as in ConvexHull_QuickHull.
+        """
+        self.hull_points = self.points[self.vertices]
+        self.simplices = np.column_stack([self.vertices, np.roll(self.vertices, -1)])
+
+        x = self.hull_points[:, 0]
+        y = self.hull_points[:, 1]
+        self.area = 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+
+    def __len__(self):
+        """Return number of vertices in convex hull"""
+        return len(self.vertices)
+
+
+# The worker process's view of the points, set up once by _init_worker
+_memory = None
+_points = None
+_engine = None
+_prefilter = None
+
+
+def _init_worker(name, points, engine, prefilter):
+    """Map the shared block name (points is its shape), or use points as is."""
+    global _memory, _points, _engine, _prefilter
+    if name is not None:
+        _memory = shared_memory.SharedMemory(name=name)
+        points = np.ndarray(points, dtype=np.float64, buffer=_memory.buf)
+    _points = points
+    _engine = engine
+    _prefilter = prefilter
+
+
+def _shard_hull(bounds):
+    """Hull vertices of points[start:stop] as input indices, in (x, y) order."""
+    start, stop = bounds
+    shard = _points[start:stop]
+    hull = ConvexHull(shard, engine=_engine, prefilter=_prefilter).vertices
+    if len(hull) == 1:
+        # A shard on one vertical line collapses to its lowest point, but
+        # its top point can still be a vertex of the whole hull
+        hull = np.unique(lexicographic_extremes(shard))
+    hull = hull[np.lexsort((hull, shard[hull, 1], shard[hull, 0]))]
+    return hull + start
+
+
+def _merge_hulls(points, a, b):
+    """
+    Hull of two hulls given as input indices in (x, y) order (ties by
+    index), in the same form: merged as sorted lists, then one monotone
+    chain. A point repeated across the two keeps its lowest index.
+    """
+    merged = list(heapq.merge(zip(points[a, 0].tolist(), points[a, 1].tolist(), a.tolist()),
+                              zip(points[b, 0].tolist(), points[b, 1].tolist(), b.tolist())))
+    distinct = [merged[0]]
+    for entry in merged[1:]:
+        if entry[:2] != distinct[-1][:2]:
+            distinct.append(entry)
+    xs, ys, indices = (np.array(column) for column in zip(*distinct))
+
+    keep = np.zeros(len(indices), dtype=bool)
+    keep[_sorted_hull(xs, ys)] = True
+    return indices[keep].astype(np.intp)
+
+
+def _hull_order(points, hull):
+    """
+    Vertices in (x, y) order to ConvexHull_QuickHull's order: clockwise
+    from the leftmost point, and a single point when all share one x.
+    """
+    if len(hull) == 0 or points[hull[0], 0] == points[hull[-1], 0]:
+        return hull[:1]
+    return hull[_sorted_hull(points[hull, 0], points[hull, 1])]
+
+
+if __name__ == "__main__":
+    # python sharded_hull.py [points] [workers]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else SHARDED_HULL_WORKERS
+
+    points = np.random.rand(count, 2)
+    start_time = time.perf_counter()
+    serial = ConvexHull(points)
+    serial_seconds = time.perf_counter() - start_time
+    hull = ShardedConvexHull(points, workers=workers)
+
+    print("\n_______________________________________________")
+    print(f"Points volume: {count}")
+    print(f"Workers: {hull.workers}")
+    print(f"Hull vertices: {len(hull)}")
+    print(f"Same vertices as serial: {np.array_equal(hull.vertices, serial.vertices)}")
+    print(f"Serial time: {serial_seconds:.4f} seconds")
+    print(f"Sharded time: {hull.seconds:.4f} seconds")
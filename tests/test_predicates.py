@@ -0,0 +1,159 @@
+from fractions import Fraction
+
+import numpy as np
+import pytest
+from batched_hulls import BatchedConvexHulls
+from convex_layers import compute_convex_layers
+from convexhull_quickhull_implementation import ConvexHull_QuickHull
+from dynamic_hull import DynamicConvexHull
+from hull_engines import HULL_ENGINES, ConvexHull
+from out_of_core_hull import OutOfCoreConvexHull
+from predicates import orientation, orientation_bound, orientation_sign
+from sharded_hull import ShardedConvexHull
+
+LAYER_ENGINES = [("quickhull", "indexed"), ("quickhull", "monotone_chain"), ("quickhull", "reference"),
+                 ("presorted", "indexed"), ("hull_tree", "indexed")]
+
+
+def exact_sign(ax, ay, bx, by, cx, cy):
+    """Sign of (b - a) x (c - a) in rational arithmetic."""
+    ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+    det = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (det > 0) - (det < 0)
+
+
+def near_collinear(rng, n):
+    """Triples on or a few ulps off the line y = x, where the float sign is unreliable."""
+    a = 0.5 + rng.integers(0, 256, (n, 2)) * np.finfo(float).eps
+    b = np.full((n, 2), 12.0)
+    c = np.full((n, 2), 24.0)
+    return a, b, c
+
+
+def shapes(rng):
+    """Inputs that used to split the engines: grids, collinear, vertical and repeated points."""
+    cases = {
+        "grid": np.array([[x, y] for x in range(20) for y in range(20)], float),
+        "collinear": np.column_stack([np.linspace(0, 1000, 50), np.full(50, 500.0)]),
+        "vertical": np.column_stack([np.zeros(9), rng.permutation(9).astype(float)]),
+        "vertical_remnant": np.vstack([rng.random((40, 2)) * 10 + [-20, 0],
+                                       np.column_stack([np.zeros(15), rng.permutation(15).astype(float)]),
+                                       [[20, 5]]]),
+        "single": np.array([[3.0, 3.0]] * 4),
+    }
+    for t in range(40):
+        n = int(rng.integers(1, 25))
+        points = rng.integers(0, 4, (n, 2)).astype(float)
+        points[:int(rng.integers(0, n + 1)), 0] = 1.0
+        cases[f"duplicates_{t}"] = points
+    return cases
+
+
+CASES = shapes(np.random.default_rng(3))
+
+
+def test_orientation_sign_is_exact():
+    rng = np.random.default_rng(0)
+    a, b, c = near_collinear(rng, 200)
+    for (ax, ay), (bx, by), (cx, cy) in zip(a, b, c):
+        assert orientation_sign(ax, ay, bx, by, cx, cy) == exact_sign(ax, ay, bx, by, cx, cy)
+
+
+@pytest.mark.parametrize("static", [False, True])
+def test_orientation_is_exact(static):
+    rng = np.random.default_rng(1)
+    a, b, c = near_collinear(rng, 500)
+    a = np.vstack([a, rng.random((500, 2))])
+    b = np.vstack([b, rng.random((500, 2))])
+    c = np.vstack([c, rng.random((500, 2))])
+    bound = orientation_bound(np.vstack([a, b, c])) if static else None
+    det = orientation(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1], bound=bound)
+    expected = [exact_sign(*a[i], *b[i], *c[i]) for i in range(len(a))]
+    assert np.sign(det).astype(int).tolist() == expected
+
+
+def test_orientation_on_grid():
+    # Grid coordinates from linspace: many triples are collinear, and the
+    # float cross product rounds some of them away from zero
+    rng = np.random.default_rng(2)
+    values = np.linspace(0, 1000, 37)
+    a, b, c = (values[rng.integers(0, 37, (3000, 2))] for _ in range(3))
+    b[::2, 0] = a[::2, 0] + 3 * (c[::2, 0] - a[::2, 0])
+    b[::2, 1] = a[::2, 1] + 3 * (c[::2, 1] - a[::2, 1])
+    det = orientation(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1])
+    expected = [exact_sign(*a[i], *b[i], *c[i]) for i in range(len(a))]
+    assert np.sign(det).astype(int).tolist() == expected
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_hull_engines_agree(name):
+    points = CASES[name]
+    expected = ConvexHull_QuickHull(points).vertices.tolist()
+    for engine in HULL_ENGINES:
+        for prefilter in (False, True):
+            assert ConvexHull(points, engine=engine, prefilter=prefilter).vertices.tolist() == expected, engine
+    assert ShardedConvexHull(points, workers=1, shards=3).vertices.tolist() == expected
+    for chunk_size in (1, 2, 5):
+        assert OutOfCoreConvexHull(points, chunk_size=chunk_size).vertices.tolist() == expected
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_batched_hulls_agree(name):
+    points = CASES[name]
+    labels = np.random.default_rng(len(points)).integers(0, 3, len(points))
+    # One group per label, and a label per vertical line
+    for labels in (labels, points[:, 0].astype(int)):
+        batched = BatchedConvexHulls(points, labels)
+        for i, label in enumerate(batched.group_labels):
+            group = np.flatnonzero(labels == label)
+            expected = ConvexHull_QuickHull(points[group])
+            assert batched.hull_vertices(i).tolist() == group[expected.vertices].tolist()
+            assert batched.area[i] == pytest.approx(expected.area)
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_layer_engines_agree(name):
+    points = CASES[name]
+    for dedup in (False, True):
+        for permit in (True, False):
+            layers = [compute_convex_layers(points, engine=engine, hull_engine=hull_engine, output="csr",
+                                            dedup=dedup, permit_1_or_2_remaining=permit)
+                      for engine, hull_engine in LAYER_ENGINES]
+            for other, (engine, hull_engine) in zip(layers[1:], LAYER_ENGINES[1:]):
+                assert len(other) == len(layers[0]), (engine, hull_engine)
+                assert np.array_equal(other.depth, layers[0].depth), (engine, hull_engine)
+
+
+def test_dynamic_hull_matches_rebuild():
+    rng = np.random.default_rng(5)
+    for t in range(100):
+        points = rng.integers(0, 4, (int(rng.integers(1, 8)), 2)).astype(float)
+        if t % 2:
+            points[:, 0] = 1.0
+        hull = DynamicConvexHull.from_points(points[:1])
+        ids = [0]
+        for point in points[1:]:
+            ids.append(hull.insert(point))
+        for i in list(ids):
+            if len(ids) > 1 and rng.random() < 0.4:
+                hull.delete(i)
+                ids.remove(i)
+        alive = np.array(ids)
+        expected = ConvexHull_QuickHull(hull.points[alive])
+        assert hull.vertices.tolist() == alive[expected.vertices].tolist()
+        assert hull.area == pytest.approx(expected.area)
+
+
+@pytest.mark.parametrize("transpose", [False, True])
+def test_contains_degenerate_hull(transpose):
+    # A vertical hull collapses to its lowest vertex, but contains its whole segment
+    points = np.column_stack([np.zeros(5), np.arange(5.0)])
+    outside = np.array([[0.0, -1.0], [0.0, 5.0], [1.0, 2.0]])
+    if transpose:
+        points = points[:, ::-1]
+        outside = outside[:, ::-1]
+    hull = ConvexHull_QuickHull(points)
+    assert hull.contains(points).all()
+    assert not hull.signed_distance(points).any()
+    assert not hull.contains(outside).any()
+    assert hull.signed_distance(outside).tolist() == [1.0, 1.0, 1.0]